@@ -0,0 +1,99 @@
+"""
+benchmarks.bench_live_lyric
+~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+模拟 mpv ``time-pos`` 事件流，测试 :meth:`LiveLyric.on_position_changed`
+的耗时，以及切换歌曲时解析歌词的耗时::
+
+    python -m benchmarks.bench_live_lyric
+"""
+
+import random
+import time
+
+from fuocore.live_lyric import LiveLyric
+from fuocore.models import LyricModel, SongModel
+
+
+LINE_COUNT = 1000
+DURATION = 600  # seconds
+TICK = 0.05  # mpv emits time-pos about every 50ms
+
+
+class FakeLyric(object):
+    def __init__(self, content):
+        self.content = content
+
+
+class FakeSong(object):
+    def __init__(self, lyric):
+        self.lyric = lyric
+
+
+def make_song(line_count=LINE_COUNT, duration=DURATION):
+    lines = []
+    step = duration / line_count
+    for i in range(line_count):
+        ms = i * step
+        lines.append('[{:02d}:{:05.2f}]line {}'.format(
+            int(ms // 60), ms % 60, i))
+    return FakeSong(FakeLyric('\n'.join(lines)))
+
+
+def make_model_songs(count, line_count=100):
+    """songs with key, so that their timelines can be cached"""
+    content = make_song(line_count).lyric.content
+    return [SongModel(source='fake', identifier=i,
+                      lyric=LyricModel(source='fake', identifier=i,
+                                       content=content))
+            for i in range(count)]
+
+
+def sequential_positions(duration=DURATION, tick=TICK):
+    count = int(duration / tick)
+    return [i * tick for i in range(count)]
+
+
+def seeking_positions(duration=DURATION, tick=TICK, seek_every=100):
+    positions = []
+    position = 0
+    for i in range(int(duration / tick)):
+        if i % seek_every == 0:
+            position = random.uniform(0, duration)
+        else:
+            position += tick
+        positions.append(position)
+    return positions
+
+
+def bench(live_lyric, positions):
+    on_position_changed = live_lyric.on_position_changed
+    t = time.perf_counter()
+    for position in positions:
+        on_position_changed(position)
+    return time.perf_counter() - t
+
+
+def main():
+    random.seed(0)
+    live_lyric = LiveLyric()
+    live_lyric.on_song_changed(make_song())
+    for name, positions in (('sequential', sequential_positions()),
+                            ('seeking', seeking_positions())):
+        cost = bench(live_lyric, positions)
+        print('{:<10} {} ticks: {:.3f}s ({:.2f}us/tick)'.format(
+            name, len(positions), cost, cost / len(positions) * 1e6))
+
+    songs = make_model_songs(20)
+    live_lyric = LiveLyric()
+    for name in ('cold', 'cached'):
+        t = time.perf_counter()
+        for song in songs:
+            live_lyric.on_song_changed(song)
+        cost = time.perf_counter() - t
+        print('song changed, {:<6} {:.2f}us/song'.format(
+            name, cost / len(songs) * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+benchmarks.bench_local_scan
+~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+测试各格式音乐文件元数据的读取速度（文件数/秒），对比按扩展名选择解析器
+和 ``mutagen.File`` 自动检测格式这两种方式，以及快速模式（fast）::
+
+    python -m benchmarks.bench_local_scan
+    python -m benchmarks.bench_local_scan ~/Music  # 使用本地的音乐文件
+
+默认使用 data/fixtures 中的样例文件，每个文件复制多份到临时目录中。
+"""
+
+from collections import defaultdict
+from functools import partial
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from fuocore.local.provider import scan_directory
+from fuocore.local.tags import read_any, read_metadata
+
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), '../data/fixtures')
+SAMPLES = ('ybwm-ts.mp3', 'sample.flac', 'sample.ogg', 'sample.m4a')
+COPY_COUNT = 200
+
+
+def make_library(directory, count=COPY_COUNT):
+    for sample in SAMPLES:
+        name, ext = os.path.splitext(sample)
+        for i in range(count):
+            shutil.copy(os.path.join(FIXTURES_DIR, sample),
+                        os.path.join(directory, '{}-{}{}'.format(name, i, ext)))
+
+
+def bench(read, files):
+    t = time.perf_counter()
+    for fpath in files:
+        try:
+            read(fpath)
+        except Exception:  # noqa
+            pass
+    return time.perf_counter() - t
+
+
+def main():
+    tmpdir = None
+    if len(sys.argv) > 1:
+        directory = sys.argv[1]
+    else:
+        tmpdir = tempfile.TemporaryDirectory()
+        directory = tmpdir.name
+        make_library(directory)
+
+    ext_files_map = defaultdict(list)
+    for fpath in scan_directory(directory, depth=3):
+        ext_files_map[fpath.rsplit('.', 1)[-1].lower()].append(fpath)
+
+    for ext, files in sorted(ext_files_map.items()):
+        # warm up os page cache, so that we measure parsing
+        bench(read_any, files)
+        any_cost = bench(read_any, files)
+        cost = bench(read_metadata, files)
+        fast_cost = bench(partial(read_metadata, fast=True), files)
+        print('{:<5} {:>5} files: read_metadata {:>8.0f} files/s, '
+              'fast {:>8.0f} files/s, mutagen.File {:>8.0f} files/s'.format(
+                  ext, len(files), len(files) / cost, len(files) / fast_cost,
+                  len(files) / any_cost))
+
+    if tmpdir is not None:
+        tmpdir.cleanup()
+
+
+if __name__ == '__main__':
+    main()
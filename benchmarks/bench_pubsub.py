@@ -0,0 +1,72 @@
+"""
+benchmarks.bench_pubsub
+~~~~~~~~~~~~~~~~~~~~~~~
+
+发布歌词到大量本地订阅者，测试每条消息的平均耗时::
+
+    python -m benchmarks.bench_pubsub
+"""
+
+import asyncio
+import socket
+import time
+
+from fuocore.pubsub import Gateway
+
+
+SUBSCRIBER_COUNT = 1000
+MESSAGE_COUNT = 200
+TOPIC = 'topic.live_lyric'
+LYRIC = '互いのすべてを　知りつくすまでが\n'
+
+
+def setup(loop, count=SUBSCRIBER_COUNT):
+    gateway = Gateway(loop=loop, subscriber_maxsize=MESSAGE_COUNT)
+    gateway.add_topic(TOPIC)
+    clients = []
+    writers = []
+    for i in range(count):
+        server_conn, client_conn = socket.socketpair()
+        server_conn.setblocking(False)
+        subscriber = gateway.create_subscriber(('127.0.0.1', i), server_conn)
+        gateway.link(TOPIC, subscriber)
+        writers.append(loop.create_task(subscriber.run()))
+        clients.append((server_conn, client_conn))
+    return gateway, clients, writers
+
+
+async def wait_until_sent(gateway):
+    while any(subscriber.lag for subscriber in gateway.subscribers):
+        await asyncio.sleep(0)
+
+
+def main():
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    gateway, clients, writers = setup(loop)
+
+    t = time.perf_counter()
+    for _ in range(MESSAGE_COUNT):
+        gateway._publish(LYRIC, TOPIC)
+    enqueue_cost = time.perf_counter() - t
+    loop.run_until_complete(wait_until_sent(gateway))
+    total_cost = time.perf_counter() - t
+
+    print('{} subscribers, {} messages'.format(
+        SUBSCRIBER_COUNT, MESSAGE_COUNT))
+    print('enqueue: {:.2f}us/message'.format(
+        enqueue_cost / MESSAGE_COUNT * 1e6))
+    print('enqueue + send: {:.2f}us/message'.format(
+        total_cost / MESSAGE_COUNT * 1e6))
+
+    for writer in writers:
+        writer.cancel()
+    loop.run_until_complete(asyncio.sleep(0))
+    for server_conn, client_conn in clients:
+        server_conn.close()
+        client_conn.close()
+    loop.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+benchmarks.bench_schemas
+~~~~~~~~~~~~~~~~~~~~~~~~
+
+对比 marshmallow Schema 和编译版 loader 反序列化网易云歌单、搜索结果的耗时::
+
+    python -m benchmarks.bench_schemas
+"""
+
+import json
+import os
+import time
+
+from fuocore.netease.schemas import (
+    NeteasePlaylistSchema,
+    NeteaseSongSchema,
+    load_playlist,
+    load_song,
+)
+
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), '../data/fixtures')
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name)) as f:
+        return json.load(f)
+
+
+def bench(func, *args, repeat=20):
+    costs = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        func(*args)
+        costs.append(time.perf_counter() - t)
+    return min(costs)
+
+
+def main():
+    playlist = read_fixture('playlist.json')['result']
+    songs = read_fixture('search.json')['result']['songs']
+
+    cases = (
+        ('playlist({} tracks)'.format(len(playlist['tracks'])),
+         lambda: NeteasePlaylistSchema(strict=True).load(playlist),
+         lambda: load_playlist(playlist)),
+        ('search({} songs)'.format(len(songs)),
+         lambda: [NeteaseSongSchema(strict=True).load(s) for s in songs],
+         lambda: [load_song(s) for s in songs]),
+    )
+    for name, reference, compiled in cases:
+        reference_cost = bench(reference)
+        compiled_cost = bench(compiled)
+        print('{}: marshmallow {:.2f}ms, compiled {:.2f}ms, x{:.1f}'.format(
+            name, reference_cost * 1e3, compiled_cost * 1e3,
+            reference_cost / compiled_cost))
+
+
+if __name__ == '__main__':
+    main()
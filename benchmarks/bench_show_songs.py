@@ -0,0 +1,71 @@
+"""
+benchmarks.bench_show_songs
+~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+测试 ``list`` 等命令展示大量歌曲时的耗时::
+
+    python -m benchmarks.bench_show_songs
+"""
+
+import random
+import time
+
+from fuocore.models import AlbumModel, ArtistModel, SongModel
+from fuocore.protocol.handlers.helpers import _fit_text, show_songs
+
+
+SONG_COUNT = 100000
+
+TITLES = (
+    'Tragedy Night',
+    '世界が終るまでは',
+    '晴天',
+    'Hotel California (Live On MTV, 1994)',
+    '七里香',
+    '사랑했나봐',
+)
+ARTIST_NAMES = ('WANDS', '周杰伦', 'Eagles', '윤도현', 'Taylor Swift')
+
+
+def make_songs(count=SONG_COUNT):
+    songs = []
+    for i in range(count):
+        artist = ArtistModel(source='local',
+                             identifier=i,
+                             name=random.choice(ARTIST_NAMES))
+        album = AlbumModel(source='local', identifier=i, name='album')
+        song = SongModel(source='local',
+                         identifier=i,
+                         title='{} {}'.format(random.choice(TITLES), i % 100),
+                         artists=[artist],
+                         album=album)
+        songs.append(song)
+    return songs
+
+
+def bench(func, *args, repeat=3):
+    costs = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        func(*args)
+        costs.append(time.perf_counter() - t)
+    return min(costs)
+
+
+def main():
+    random.seed(0)
+    songs = make_songs()
+    print('show_songs({} songs), cold: {:.3f}s'.format(
+        SONG_COUNT, bench(show_songs, songs, repeat=1)))
+    print('show_songs({} songs), warm: {:.3f}s'.format(
+        SONG_COUNT, bench(show_songs, songs)))
+
+    _fit_text.cache_clear()
+    texts = [song.title for song in songs]
+    print('_fit_text({} titles), uncached: {:.3f}s'.format(
+        SONG_COUNT,
+        bench(lambda: [_fit_text.__wrapped__(t, 18, False) for t in texts])))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,32 @@
+"""
+benchmarks.bench_signal
+~~~~~~~~~~~~~~~~~~~~~~~
+
+测试 :meth:`Signal.emit` 在不同数量 receiver 下的耗时::
+
+    python -m benchmarks.bench_signal
+"""
+
+import timeit
+
+from fuocore.dispatch import Signal
+
+
+class Receiver(object):
+    def on_position_changed(self, position):
+        pass
+
+
+def main(number=100000):
+    for count in (0, 1, 10):
+        signal = Signal()
+        receivers = [Receiver() for _ in range(count)]
+        for receiver in receivers:
+            signal.connect(receiver.on_position_changed)
+        cost = timeit.timeit(lambda: signal.emit(1.0), number=number)
+        print('emit with {:>2} receivers: {:.3f}us'.format(
+            count, cost / number * 1e6))
+
+
+if __name__ == '__main__':
+    main()
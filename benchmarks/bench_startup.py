@@ -0,0 +1,174 @@
+"""
+benchmarks.bench_startup
+~~~~~~~~~~~~~~~~~~~~~~~~
+
+测试启动耗时：各模块的冷导入耗时，以及从启动进程到第一条命令得到响应的耗时。
+每一项都在新的 python 进程中测试，超过阈值时以非 0 状态码退出::
+
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --top 20  # 展示更多导入耗时明细
+
+导入耗时的明细来自 ``python -X importtime`` （python 3.7+）。
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+
+
+#: 冷导入耗时阈值（秒），mpv 导入时会加载 libmpv
+IMPORT_THRESHOLDS = (
+    ('fuocore', 0.3),
+    ('fuocore.main', 0.5),
+    ('fuocore.local', 1.0),
+    ('fuocore.netease', 1.0),
+    ('fuocore.qqmusic', 1.0),
+    ('mpv', 0.5),
+)
+#: 启动进程到第一条命令得到响应的耗时阈值（秒）
+FIRST_COMMAND_THRESHOLD = 1.0
+
+ROOT_DIR = os.path.join(os.path.dirname(__file__), '..')
+
+
+def run_python(*args, **kwargs):
+    return subprocess.Popen([sys.executable] + list(args),
+                            cwd=ROOT_DIR,
+                            stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE,
+                            universal_newlines=True,
+                            **kwargs)
+
+
+def parse_importtime(output):
+    """parse ``-X importtime`` output
+
+    :return: list of (self_us, cumulative_us, module)
+    """
+    records = []
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3:
+            continue
+        try:
+            self_us, cumulative_us = int(parts[0]), int(parts[1])
+        except ValueError:  # table header
+            continue
+        records.append((self_us, cumulative_us, parts[2].strip()))
+    return records
+
+
+def measure_import(module):
+    """import module in a new process
+
+    :return: (cost, records), cost is None if import failed
+    """
+    code = ('import time; t = time.perf_counter(); import {}; '
+            'print(time.perf_counter() - t)'.format(module))
+    proc = run_python('-X', 'importtime', '-c', code)
+    stdout, stderr = proc.communicate()
+    records = parse_importtime(stderr)
+    if proc.returncode != 0:
+        return None, records
+    return float(stdout.strip().splitlines()[-1]), records
+
+
+def find_free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def serve(port):
+    """run command server with null player, like ``fuocore.main.main``"""
+    from fuocore.app import run_server
+    from fuocore.main import App, load_local_library, setup_library
+    from fuocore.player import NullPlayer
+    from fuocore.pubsub import run as run_pubsub
+
+    player = NullPlayer()
+    player.initialize()
+    library = setup_library()
+    pubsub_gateway, _ = run_pubsub(host='127.0.0.1', port=find_free_port())
+    app = App(player, library, pubsub_gateway)
+    event_loop = asyncio.get_event_loop()
+    event_loop.create_task(
+        run_server(app, app.live_lyric, host='127.0.0.1', port=port))
+    event_loop.run_in_executor(None, load_local_library, library)
+    event_loop.run_forever()
+
+
+def measure_first_command(timeout=10):
+    """time from starting the daemon process to first command response"""
+    port = find_free_port()
+    t = time.perf_counter()
+    proc = run_python('-m', 'benchmarks.bench_startup',
+                      '--serve', str(port))
+    try:
+        while time.perf_counter() - t < timeout:
+            if proc.poll() is not None:
+                return None
+            try:
+                conn = socket.create_connection(('127.0.0.1', port))
+            except ConnectionRefusedError:
+                time.sleep(0.005)
+                continue
+            with conn:
+                conn.recv(1024)  # welcome message
+                conn.sendall(b'status\n')
+                conn.recv(1024)
+            return time.perf_counter() - t
+        return None
+    finally:
+        proc.kill()
+        proc.communicate()
+
+
+def report(name, cost, threshold):
+    if cost is None:
+        print('{:<24} failed'.format(name))
+        return False
+    ok = cost <= threshold
+    print('{:<24} {:>8.1f}ms  (threshold {:.0f}ms) {}'.format(
+        name, cost * 1e3, threshold * 1e3, '' if ok else 'SLOW'))
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description='测试启动耗时')
+    parser.add_argument('--top', type=int, default=5,
+                        help='展示每个模块中自身导入耗时最多的 N 个模块')
+    parser.add_argument('--serve', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve)
+        return
+
+    ok = True
+    for module, threshold in IMPORT_THRESHOLDS:
+        cost, records = measure_import(module)
+        if cost is None and module == 'mpv':
+            # 没有安装 libmpv，不使用 MpvPlayer 时也不需要它
+            print('{:<24} skipped (libmpv is not available)'.format(module))
+            continue
+        ok = report('import ' + module, cost, threshold) and ok
+        for self_us, cumulative_us, name in \
+                sorted(records, reverse=True)[:args.top]:
+            print('    {:>8.1f}ms self {:>8.1f}ms cumulative  {}'.format(
+                self_us / 1e3, cumulative_us / 1e3, name))
+
+    cost = measure_first_command()
+    ok = report('first command', cost, FIRST_COMMAND_THRESHOLD) and ok
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
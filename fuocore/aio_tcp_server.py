@@ -27,6 +27,15 @@ class TcpServer(object):
 
         event_loop = asyncio.get_event_loop()
         while True:
-            conn, addr = await event_loop.sock_accept(sock)
+            try:
+                conn, addr = await event_loop.sock_accept(sock)
+            except OSError:  # sock is closed
+                logger.debug('Tcp server is closed.')
+                break
             event_loop.create_task(
                 self.handle_func(conn, addr, *args, **kwargs))
+
+    def close(self):
+        logger.debug('Closing tcp server: %s:%d' % (self.host, self.port))
+        if self._sock is not None:
+            self._sock.close()
@@ -7,19 +7,23 @@ It provides a CliMixin to make integration easilly.
 
 import asyncio
 import logging
+import os
 import sys
+import time
 from collections import defaultdict
 from urllib.parse import urlparse
 
 from fuocore.aio_tcp_server import TcpServer
-from fuocore import MpvPlayer
 from fuocore import LiveLyric
+from fuocore.lyric import LyricCache
 from fuocore.furi import parse_furi
 from fuocore.protocol.parser import CmdParser
 from fuocore.protocol.handlers import exec_cmd
 
 logger = logging.getLogger(__name__)
 
+LYRIC_CACHE_DIR = os.path.expanduser('~') + '/.FeelUOwn/cache/lyrics'
+
 
 class LiveLyricPublisher(object):
     topic = 'topic.live_lyric'
@@ -31,6 +35,63 @@ class LiveLyricPublisher(object):
     def publish(self, sentence):
         self.gateway.publish(sentence + '\n', self.topic)
 
+    def publish_line(self, sentence, translation):
+        """publish sentence and its translation in one line
+
+        Each message is exactly one line, the translation (if any) follows
+        the sentence and is separated by a tab, so that client can split
+        each line by the first tab, no matter whether it is translated.
+        """
+        line = sentence.replace('\t', ' ')
+        if translation:
+            line += '\t' + translation.replace('\t', ' ')
+        self.publish(line)
+
+
+class PlayerPublisher(object):
+    """publish player and playlist events to pubsub gateway
+
+    Each message is a line like ``player.state playing``, so that a client
+    can subscribe many topics in one connection.
+    """
+    state_topic = 'player.state'
+    position_topic = 'player.position'
+    volume_topic = 'player.volume'
+    song_changed_topic = 'playlist.song_changed'
+
+    def __init__(self, gateway, player, position_interval=1):
+        """
+        :param position_interval: min interval (seconds) of position messages
+        """
+        self.gateway = gateway
+        self.player = player
+        self._position_interval = position_interval
+        self._position_published_at = 0
+
+        for topic in (self.state_topic, self.position_topic,
+                      self.volume_topic, self.song_changed_topic):
+            gateway.add_topic(topic)
+
+    def _publish(self, topic, value):
+        self.gateway.publish('{} {}\n'.format(topic, value), topic)
+
+    def publish_state(self, state):
+        self._publish(self.state_topic, state.name)
+        self.publish_position(self.player.position, force=True)
+
+    def publish_position(self, position, force=False):
+        now = time.monotonic()
+        elapsed = now - self._position_published_at
+        if force or elapsed >= self._position_interval:
+            self._position_published_at = now
+            self._publish(self.position_topic, position)
+
+    def publish_volume(self, volume):
+        self._publish(self.volume_topic, volume)
+
+    def publish_song_changed(self, song):
+        self._publish(self.song_changed_topic, '' if song is None else song)
+
 
 class CliAppMixin(object):
     """
@@ -39,20 +100,38 @@ class CliAppMixin(object):
     this mixin helps avoid duplicate code temporarily.
     """
     def __init__(self):
-        live_lyric = LiveLyric()
+        # player signals may be emitted in mpv event thread, slots are
+        # called in event loop so that mpv event thread is never blocked
+        loop = asyncio.get_event_loop()
+
+        live_lyric = LiveLyric(loop=loop,
+                               lyric_cache=LyricCache(LYRIC_CACHE_DIR))
         live_lyric_publisher = LiveLyricPublisher(self.pubsub_gateway)
 
         self.live_lyric = live_lyric
         self._live_lyric_publisher = live_lyric_publisher
 
-        live_lyric.sentence_changed.connect(live_lyric_publisher.publish)
-        self.player.position_changed.connect(live_lyric.on_position_changed)
-        self.playlist.song_changed.connect(live_lyric.on_song_changed)
+        live_lyric.line_changed.connect(live_lyric_publisher.publish_line)
+        self.player.position_changed.connect(live_lyric.on_position_changed,
+                                             loop=loop)
+        self.playlist.song_changed.connect(live_lyric.on_song_changed,
+                                           loop=loop)
+
+        player_publisher = PlayerPublisher(self.pubsub_gateway, self.player)
+        self._player_publisher = player_publisher
+        self.player.state_changed.connect(player_publisher.publish_state,
+                                          loop=loop)
+        self.player.position_changed.connect(
+            player_publisher.publish_position, loop=loop)
+        self.player.volume_changed.connect(player_publisher.publish_volume,
+                                           loop=loop)
+        self.playlist.song_changed.connect(
+            player_publisher.publish_song_changed, loop=loop)
 
 
 async def handle(conn, addr, app, live_lyric):
     event_loop = asyncio.get_event_loop()
-    event_loop.sock_sendall(conn, b'OK feeluown 1.0.0\n')
+    await event_loop.sock_sendall(conn, b'OK feeluown 1.0.0\n')
     while True:
         try:
             command = await event_loop.sock_recv(conn, 1024)
@@ -68,12 +147,11 @@ async def handle(conn, addr, app, live_lyric):
         logger.debug('RECV: ' + command)
         cmd = CmdParser.parse(command)
         msg = exec_cmd(app, live_lyric, cmd)
-        event_loop.sock_sendall(conn, bytes(msg, 'utf-8'))
+        await event_loop.sock_sendall(conn, bytes(msg, 'utf-8'))
 
 
-async def run_server(app, live_lyric, *args, **kwargs):
-    port = 23333
-    host = '0.0.0.0'
+async def run_server(app, live_lyric, *args, host='0.0.0.0', port=23333,
+                     **kwargs):
     event_loop = asyncio.get_event_loop()
     event_loop.create_task(
         TcpServer(host, port, handle_func=handle).run(app, live_lyric))
@@ -1,7 +1,8 @@
 # -*- coding: utf-8 -*-
 
-import weakref
 import logging
+import threading
+import weakref
 
 from weakref import WeakMethod
 
@@ -12,33 +13,83 @@ logger = logging.getLogger(__name__)
 class Signal(object):
     """提供 signal/slot 编程模式
 
+    receivers 按照连接的顺序被调用。receivers 是一个 tuple，
+    connect/disconnect 时会加锁并生成一个新的 tuple（copy-on-write），
+    所以 emit 不需要加锁，也可以在任意线程中调用。
+
+    连接 receiver 时可以指定一个 event loop，这时 emit 不会直接调用 receiver，
+    而是把调用投递到该 loop 中执行（类似 Qt 的 QueuedConnection），
+    这样 emit 所在的线程（比如 mpv 事件线程）不会被 receiver 阻塞。
+
     TODO: 这个类需要改进，尤其是接口设计和健壮性方面
     """
     def __init__(self, name='', *sig):
         self.sig = sig
-        self.receivers = set()
+        self.receivers = ()  # (weak reference of receiver, loop) pairs
+        self._lock = threading.RLock()
 
     def emit(self, *args):
-        for receiver in self.receivers:
-            try:
-                receiver()(*args)
-            except Exception:
-                logger.exception('receiver %s run error' % receiver())
+        for ref, loop in self.receivers:
+            receiver = ref()
+            if receiver is None:
+                continue
+            if loop is None:
+                self._call(receiver, args)
+            else:
+                try:
+                    loop.call_soon_threadsafe(self._call, receiver, args)
+                except RuntimeError:
+                    # loop is closed, it can't be reopened, so drop the
+                    # connection, otherwise it fails again on each emit
+                    logger.warning('loop of receiver %s is closed, '
+                                   'disconnect it' % receiver)
+                    self._remove_pair(ref, loop)
 
-    def _ref(self, receiver):
+    def _remove_pair(self, ref, loop):
+        with self._lock:
+            self.receivers = tuple(pair for pair in self.receivers
+                                   if pair[0] is not ref or
+                                   pair[1] is not loop)
+
+    def _call(self, receiver, args):
+        try:
+            receiver(*args)
+        except Exception:
+            logger.exception('receiver %s run error' % receiver)
+
+    def _ref(self, receiver, callback=None):
         ref = weakref.ref
         if hasattr(receiver, '__self__') and hasattr(receiver, '__func__'):
             ref = WeakMethod
-        return ref(receiver)
+        return ref(receiver, callback)
+
+    def _remove_dead_ref(self, dead_ref):
+        """weakref callback, called when a receiver is garbage collected"""
+        with self._lock:
+            self.receivers = tuple(pair for pair in self.receivers
+                                   if pair[0] is not dead_ref)
+
+    def connect(self, receiver, loop=None):
+        """connect receiver to signal
 
-    def connect(self, receiver):
-        self.receivers.add(self._ref(receiver))
+        :param loop: asyncio event loop (or any object which has a
+            ``call_soon_threadsafe`` method). If it is not None,
+            receiver will be called in that loop instead of the
+            thread which emits the signal.
+        """
+        ref = self._ref(receiver, self._remove_dead_ref)
+        with self._lock:
+            if all(ref != pair[0] for pair in self.receivers):
+                self.receivers = self.receivers + ((ref, loop), )
 
     def disconnect(self, receiver):
         receiver = self._ref(receiver)
-        if receiver in self.receivers:
-            self.receivers.remove(receiver)
-            return True
+        with self._lock:
+            receivers = tuple(pair for pair in self.receivers
+                              if pair[0] != receiver)
+            if len(receivers) != len(self.receivers):
+                self.receivers = receivers
+                return True
         return False
 
 
@@ -1,25 +1,71 @@
+import importlib
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
 
 class Library(object):
+    """provider 管理
+
+    provider 模块往往依赖较多的第三方库，有的还会在创建 provider 时做一些
+    耗时的工作，所以可以用 :meth:`register_lazy` 注册 provider 的导入路径，
+    在第一次用到这个 provider 时才导入它::
+
+        library.register_lazy('netease', 'fuocore.netease.provider:provider')
+        library.get('netease')  # import fuocore.netease.provider
+    """
+
     def __init__(self):
         self._providers = set()
+        self._lazy_providers = {}  # {identifier: 'module:attr'}
+        # 其它线程（比如后台扫描本地音乐的线程）也可能导入 provider
+        self._lock = threading.Lock()
 
     def register(self, provider):
         self._providers.add(provider)
 
+    def register_lazy(self, identifier, path):
+        """register provider by import path, without importing it
+
+        :param identifier: provider identifier
+        :param path: ``module:attr``, attr is the provider object
+        """
+        self._lazy_providers[identifier] = path
+
     def deregister(self, provider):
         self._providers.remove(provider)
 
+    def _load(self, identifier):
+        with self._lock:
+            path = self._lazy_providers.pop(identifier, None)
+            if path is None:
+                return
+            module_name, attr = path.split(':')
+            try:
+                provider = getattr(importlib.import_module(module_name), attr)
+            except Exception:  # noqa
+                logger.exception('Load provider {} failed.'.format(path))
+                return
+            if provider.identifier != identifier:
+                logger.warning('Provider identifier mismatch: {} != {}'
+                               .format(provider.identifier, identifier))
+            self.register(provider)
+
+    def _load_all(self):
+        for identifier in list(self._lazy_providers):
+            self._load(identifier)
+
     def get(self, identifier):
+        if identifier in self._lazy_providers:
+            self._load(identifier)
         for provider in self._providers:
             if provider.identifier == identifier:
                 return provider
         return None
 
     def list(self):
+        self._load_all()
         return list(self._providers)
 
     def search(self, keyword, source_in=None, **kwargs):
@@ -28,7 +74,8 @@ class Library(object):
         TODO: search album or artist
         TODO: return a generator?
         """
-        for provider in self._providers:
+        self._load_all()
+        for provider in list(self._providers):
             if source_in is not None:
                 if provider.identifier not in source_in:
                     continue
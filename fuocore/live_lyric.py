@@ -1,23 +1,53 @@
+from bisect import bisect_right
+from collections import OrderedDict
+from functools import partial
 import logging
 
 from fuocore.dispatch import Signal
-from fuocore.utils import find_previous
 
-from .lyric import parse
+from .lyric import Timeline, parse_timeline
 
 logger = logging.getLogger(__name__)
 
 
 class LiveLyric(object):
-    def __init__(self):
+    """
+    ``sentence_changed`` signal is emitted with current sentence, and
+    ``line_changed`` signal is emitted with current sentence and its
+    translation ('' if lyric has no translation).
+
+    Getting song lyric may send http requests, if ``loop`` is given,
+    lyric is loaded in the loop's default executor, and sentences are
+    shown from current position once it is loaded. Otherwise, lyric is
+    loaded synchronously in :meth:`on_song_changed`. Note that slots
+    should be called in the loop thread if ``loop`` is given.
+
+    :param cache_size: max number of parsed lyric timelines to keep,
+        so a song heard recently need not be parsed again.
+    :param loop: asyncio event loop
+    :param lyric_cache: :class:`fuocore.lyric.LyricCache`, lyric is
+        cached on disk if it is given.
+    """
+
+    def __init__(self, cache_size=50, loop=None, lyric_cache=None):
         self.sentence_changed = Signal(str)
+        self.line_changed = Signal(str, str)
+
+        self._loop = loop
+        self._lyric_cache = lyric_cache
 
+        self._song = None
+        self._position = 0  # seconds
         self._lyric = None
-        self._pos_s_map = {}  # position sentence map
-        self._pos_list = []  # position list
-        self._pos = None
+        self._timeline = Timeline()
+        self._pos_index = None  # index of current position in timeline
+
+        # {song key: ((content, trans_content), timeline)}, in LRU order
+        self._timeline_cache = OrderedDict()
+        self._timeline_cache_size = cache_size
 
         self._current_sentence = ''
+        self._current_translation = ''
 
     @property
     def current_sentence(self):
@@ -28,23 +58,122 @@ class LiveLyric(object):
         self._current_sentence = value
         self.sentence_changed.emit(value)
 
-    # TODO: performance optimization?
+    @property
+    def current_translation(self):
+        return self._current_translation
+
+    def _set_line(self, sentence, translation=''):
+        self._current_translation = translation
+        self.current_sentence = sentence
+        self.line_changed.emit(sentence, translation)
+
+    def _find_index(self, pos):
+        """find index of the last position which is not greater than ``pos``
+
+        Position changes are mostly monotonic, so we check current index
+        and the next one first, and fallback to binary search after seeking.
+
+        :return: -1 if pos is smaller than the first position
+        """
+        pos_list = self._timeline.positions
+        index = self._pos_index
+        if index is not None and pos_list[index] <= pos:
+            length = len(pos_list)
+            if index + 1 == length or pos < pos_list[index + 1]:
+                return index
+            if index + 2 == length or pos < pos_list[index + 2]:
+                return index + 1
+        return bisect_right(pos_list, pos) - 1
+
     def on_position_changed(self, position):
+        self._position = position
         if not self._lyric:
             return
 
-        pos = find_previous(position*1000 + 300, self._pos_list)
-        if pos is not None and pos != self._pos:
-            self.current_sentence = self._pos_s_map[pos]
-            self._pos = pos
+        index = self._find_index(position*1000 + 300)
+        if index >= 0 and index != self._pos_index:
+            timeline = self._timeline
+            translation = '' if timeline.translations is None \
+                else timeline.translations[index]
+            self._pos_index = index
+            self._set_line(timeline.sentences[index], translation)
+
+    def _get_timeline(self, song, content, trans_content):
+        """get timeline from cache, or parse content and cache it"""
+        key = getattr(song, 'key', None)
+        if key is None:
+            return parse_timeline(content, trans_content)
+
+        cache = self._timeline_cache
+        cached = cache.get(key)
+        # lyric content may be changed, for example, it is refreshed
+        if cached is not None:
+            cached_content, cached_trans_content = cached[0]
+            if (cached_content is content or cached_content == content) and \
+                    cached_trans_content == trans_content:
+                cache.move_to_end(key)
+                return cached[1]
+
+        timeline = parse_timeline(content, trans_content)
+        cache[key] = ((content, trans_content), timeline)
+        if len(cache) > self._timeline_cache_size:
+            cache.popitem(last=False)
+        return timeline
+
+    def _load_lyric(self, song):
+        """get lyric of song, this may block
+
+        :return: (content, trans_content), None if song has no lyric
+        """
+        lyric_cache = self._lyric_cache
+        if getattr(song, 'key', None) is None:  # song can't be cached
+            lyric_cache = None
+        if lyric_cache is not None:
+            cached = lyric_cache.get(song)
+            if cached is not None:
+                return cached
+
+        lyric = song.lyric
+        if lyric is None:
+            return None
+        content = lyric.content or ''
+        trans_content = getattr(lyric, 'trans_content', None) or ''
+        if lyric_cache is not None:
+            lyric_cache.set(song, content, trans_content)
+        return content, trans_content
+
+    def _on_lyric_loaded(self, song, future):
+        if song is not self._song:  # song has been changed again
+            return
+        try:
+            lyric = future.result()
+        except Exception:  # noqa
+            logger.exception('Load lyric of {} failed.'.format(song))
+            return
+        self._set_lyric(song, lyric)
+
+    def _set_lyric(self, song, lyric):
+        if lyric is None or not lyric[0]:
+            return
+        content, trans_content = lyric
+        self._lyric = content
+        self._timeline = self._get_timeline(song, content, trans_content)
+        self._pos_index = None
+        # resume from current position
+        self.on_position_changed(self._position)
 
     def on_song_changed(self, song):
-        if song.lyric is None:
-            self._lyric = None
-            self._pos_s_map = {}
+        self._song = song
+        self._position = 0
+        self._lyric = None
+        self._timeline = Timeline()
+        self._pos_index = None
+        self._set_line('')
+        if song is None:
+            return
+
+        if self._loop is None:
+            self._set_lyric(song, self._load_lyric(song))
         else:
-            self._lyric = song.lyric.content
-            self._pos_s_map = parse(self._lyric)
-        self._pos_list = sorted(list(self._pos_s_map.keys()))
-        self._pos = None
-        self.current_sentence = ''
+            future = self._loop.run_in_executor(None, self._load_lyric, song)
+            future.add_done_callback(partial(self._on_lyric_loaded, song))
@@ -6,12 +6,11 @@ import os
 from fuzzywuzzy import process
 from marshmallow.exceptions import ValidationError
 from mutagen import MutagenError
-from mutagen.mp3 import EasyMP3
 
+from fuocore.local.tags import EXTS, read_metadata
 from fuocore.provider import AbstractProvider
 from fuocore.utils import log_exectime
 
-from fuocore.local.schemas import EasyMP3MetadataSongSchema
 from fuocore.models import (
     BaseModel, SearchModel, SongModel, AlbumModel, ArtistModel
 )
@@ -22,7 +21,7 @@ MUSIC_LIBRARY_PATH = os.path.expanduser('~') + '/Music'
 
 
 def scan_directory(directory, exts=None, depth=2):
-    exts = exts or ['mp3']
+    exts = exts or EXTS
     if depth < 0:
         return []
 
@@ -35,51 +34,56 @@ def scan_directory(directory, exts=None, depth=2):
             files = scan_directory(path, exts, depth - 1)
             media_files.extend(files)
         elif os.path.isfile(path):
-            if path.split('.')[-1] in exts:
+            if path.rsplit('.', 1)[-1].lower() in exts:
                 media_files.append(path)
     return media_files
 
 
-def create_song(fpath):
+def create_song(fpath, fast=False):
     """
-    parse music file metadata with Easymp3 and return a song
-    model.
+    parse music file metadata and return a song model,
+    see :mod:`fuocore.local.tags` for supported formats.
+
+    :param fast: read metadata in fast mode, song duration may be estimated
     """
     try:
-        metadata = EasyMP3(fpath)
-    except MutagenError as e:
+        metadata_dict = read_metadata(fpath, fast=fast)
+    except (MutagenError, OSError) as e:
         logger.error('Mutagen parse metadata failed, ignore.')
         logger.debug(str(e))
         return
 
     schema = EasyMP3MetadataSongSchema(strict=True)
-    metadata_dict = dict(metadata)
     if 'title' not in metadata_dict:
-        title = [fpath.rsplit('/')[-1].split('.')[0], ]
+        title = [os.path.splitext(os.path.basename(fpath))[0], ]
         metadata_dict['title'] = title
-    metadata_dict.update(dict(
-        url=fpath,
-        duration=metadata.info.length * 1000  # milesecond
-    ))
+    metadata_dict['url'] = fpath
     try:
         song, _ = schema.load(metadata_dict)
     except ValidationError:
-        logger.exeception('解析音乐文件({}) 元数据失败'.format(fpath))
+        logger.exception('解析音乐文件({}) 元数据失败'.format(fpath))
+        return None
     return song
 
 
 class LocalProvider(AbstractProvider):
-    def __init__(self, library_paths=None, depth=2):
-        # TODO: 避免在初始化的时候进行 scan
-        self._library_paths = library_paths
+    """本地音乐
 
+    创建 provider 时不扫描音乐目录（目录中的文件可能很多），
+    应用需要调用 :meth:`load` 来扫描，一般是在后台线程中调用，
+    扫描完成之前，provider 中没有歌曲。
+    """
+
+    def __init__(self, library_paths=None, depth=2):
         self._songs = []
 
         self._identifier_song_map = dict()
         self._identifier_album_map = dict()
         self._identifier_artist_map = dict()
+        # {legacy identifier: identifier}, see :meth:`_get_song`
+        self._legacy_identifier_map = None
 
-        self.library_paths = library_paths or [MUSIC_LIBRARY_PATH]
+        self._library_paths = library_paths or [MUSIC_LIBRARY_PATH]
 
     @property
     def library_paths(self):
@@ -88,27 +92,132 @@ class LocalProvider(AbstractProvider):
     @library_paths.setter
     def library_paths(self, library_paths):
         self._library_paths = library_paths
-        self._songs = self.scan()
+        self.load()
+
+    def load(self, fast=False):
+        """scan library_paths and setup library
+
+        It is safe to call this method in a background thread, models are
+        replaced when all of them are ready.
+
+        :param fast: scan in fast mode, which reads only a few KiB of each
+            file, durations of some songs may be estimated, call
+            :meth:`update_durations` later to get exact durations.
+        """
+        self._songs = self.scan(fast=fast)
         self.setup_library()
 
+    @log_exectime
+    def update_durations(self):
+        """compute exact durations of songs whose duration is estimated
+
+        It reads the whole file, so it should be called in a background
+        thread after library is loaded in fast mode.
+        """
+        for song in self._songs:
+            if not song.duration_estimated:
+                continue
+            try:
+                metadata_dict = read_metadata(song.url)
+            except (MutagenError, OSError) as e:
+                logger.warning('Read duration of {} failed.'.format(song.url))
+                logger.debug(str(e))
+                continue
+            song.duration = metadata_dict['duration']
+            song.duration_estimated = False
+
     def setup_library(self):
-        self._identifier_song_map.clear()
-        self._identifier_album_map.clear()
-        self._identifier_artist_map.clear()
-
-        if not self._identifier_song_map:
-            for song in self._songs:
-                self._identifier_song_map[song.identifier] = song
-                if song.album is not None:
-                    album = song.album
-                    self._identifier_album_map[album.identifier] = album
-                if song.artists is not None:
-                    for artist in song.artists:
-                        self._identifier_artist_map[artist.identifier] = artist
+        """build song, album and artist indexes
+
+        Albums and artists with same identifier are merged, so that each
+        album has its songs (ordered by disc and track number), and each
+        artist has its albums and songs.
+        """
+        identifier_song_map = dict()
+        identifier_album_map = dict()
+        identifier_artist_map = dict()
+
+        for song in self._songs:
+            identifier = song.identifier
+            if identifier in identifier_song_map:
+                # identifier is generated from url, and it rarely collides,
+                # rehash url with a suffix to make it unique
+                i = 1
+                while identifier in identifier_song_map:
+                    identifier = gen_identifier('{}#{}'.format(song.url, i))
+                    i += 1
+                logger.warning('Song identifier {} of {} collides with {},'
+                               ' use {} instead.'.format(
+                                   song.identifier, song.url,
+                                   identifier_song_map[song.identifier].url,
+                                   identifier))
+                song.identifier = identifier
+            identifier_song_map[identifier] = song
+
+            album = song.album
+            if album is not None:
+                if album.identifier in identifier_album_map:
+                    album = identifier_album_map[album.identifier]
+                else:
+                    album.songs = []
+                    album.artists = []
+                    identifier_album_map[album.identifier] = album
+                album.songs.append(song)
+                song.album = album
+            artists = []
+            for artist in song.artists or ():
+                if artist.identifier in identifier_artist_map:
+                    artist = identifier_artist_map[artist.identifier]
+                else:
+                    artist.songs = []
+                    artist.albums = []
+                    identifier_artist_map[artist.identifier] = artist
+                artist.songs.append(song)
+                if album is not None:
+                    # albums and artists of a song are few, so list is fine
+                    if artist not in album.artists:
+                        album.artists.append(artist)
+                    if album not in artist.albums:
+                        artist.albums.append(album)
+                artists.append(artist)
+            song.artists = artists
+
+        for album in identifier_album_map.values():
+            album.songs.sort(key=_track_order)
+        for artist in identifier_artist_map.values():
+            artist.songs.sort(key=lambda song: (song.album_name, ) +
+                              _track_order(song))
+            artist.albums.sort(key=lambda album: album.name)
+
+        self._identifier_song_map = identifier_song_map
+        self._identifier_album_map = identifier_album_map
+        self._identifier_artist_map = identifier_artist_map
+        self._legacy_identifier_map = None
+
+    def _get_song(self, identifier):
+        """get song by identifier
+
+        Identifiers generated by old versions are also supported,
+        so that fuo uri saved by users still works.
+        """
+        song = self._identifier_song_map.get(identifier)
+        if song is None and is_legacy_identifier(identifier):
+            legacy_identifier_map = self._legacy_identifier_map
+            if legacy_identifier_map is None:
+                # it is slow, so it is built on demand
+                legacy_identifier_map = {
+                    gen_legacy_identifier(song.url): song.identifier
+                    for song in self._songs}
+                self._legacy_identifier_map = legacy_identifier_map
+            identifier = legacy_identifier_map.get(str(identifier))
+            song = self._identifier_song_map.get(identifier)
+        return song
 
     @log_exectime
-    def scan(self, exts=['mp3'], depth=2):
+    def scan(self, exts=None, depth=2, fast=False):
         """scan media files in all library_paths
+
+        :param fast: see :func:`create_song`
         """
         depth = depth if depth <= 3 else 3
         media_files = []
@@ -116,8 +225,9 @@ class LocalProvider(AbstractProvider):
             logger.debug('正在扫描目录({})...'.format(directory))
             media_files.extend(scan_directory(directory, exts, depth))
         songs = []
-        for fpath in media_files:
-            song = create_song(fpath)
+        # sort files, so that identifiers are stable even if they collide
+        for fpath in sorted(media_files):
+            song = create_song(fpath, fast=fast)
             if song is not None:
                 songs.append(song)
             else:
@@ -157,28 +267,48 @@ class LocalProvider(AbstractProvider):
 provider = LocalProvider()
 
 
-class NBaseModel(BaseModel):
+class LBaseModel(BaseModel):
     class Meta:
         provider = provider
 
 
-class LSongModel(SongModel, BaseModel):
+def _track_order(song):
+    return (song.disc, song.track, song.title)
+
+
+class LSongModel(SongModel, LBaseModel):
+    class Meta:
+        # duration_estimated: duration is estimated in fast scan mode
+        fields = ('disc', 'track', 'duration_estimated')
+
     @classmethod
     def get(cls, identifier):
-        return cls._meta.provider._identifier_song_map.get(identifier)
+        return cls._meta.provider._get_song(identifier)
 
     @classmethod
     def list(cls, identifiers):
-        return map(cls._meta.provider._identifier_song_map.get, identifiers)
+        return map(cls._meta.provider._get_song, identifiers)
 
 
-class LAlbumModel(AlbumModel, BaseModel):
+class LAlbumModel(AlbumModel, LBaseModel):
     @classmethod
     def get(cls, identifier):
         return cls._meta.provider._identifier_album_map.get(identifier)
 
 
-class LArtistModel(ArtistModel, BaseModel):
+class LArtistModel(ArtistModel, LBaseModel):
+    class Meta:
+        fields = ('albums', )
+
     @classmethod
     def get(cls, identifier):
         return cls._meta.provider._identifier_artist_map.get(identifier)
+
+
+# import loop
+from fuocore.local.schemas import (  # noqa
+    EasyMP3MetadataSongSchema,
+    gen_identifier,
+    gen_legacy_identifier,
+    is_legacy_identifier,
+)
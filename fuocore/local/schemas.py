@@ -3,20 +3,53 @@ import base64
 
 from marshmallow import Schema, post_load, fields
 
-from fuocore.schemas import SongSchema
-from fuocore.utils import elfhash
+from fuocore.utils import digest, elfhash
 
 
 SOURCE = 'local'
 
 
+def gen_identifier(url):
+    """generate song identifier from song url"""
+    return digest(url)
+
+
+def gen_legacy_identifier(url):
+    """identifier generated by old versions, which is slow and collides
+    frequently, it is used to find songs by old fuo uri
+    """
+    return str(elfhash(base64.b64encode(bytes(url, 'utf-8'))))
+
+
+def is_legacy_identifier(identifier):
+    """legacy identifier is a 31 bits integer, while identifier
+    generated by :func:`gen_identifier` has 16 hex digits"""
+    identifier = str(identifier)
+    return len(identifier) <= 10 and identifier.isdigit()
+
+
+def parse_number(value):
+    """parse track number or disc number, 0 if it is invalid
+
+    >>> parse_number('3/12'), parse_number('2'), parse_number('')
+    (3, 2, 0)
+    """
+    try:
+        return int(value.split('/')[0])
+    except ValueError:
+        return 0
+
+
 class EasyMP3MetadataSongSchema(Schema):
-    """EasyMP3 metadata"""
+    """EasyMP3 style metadata, see :mod:`fuocore.local.tags`"""
     url = fields.Str(required=True)
     title_list = fields.List(fields.Str(), load_from='title', required=True)
     duration = fields.Float(required=True)
+    duration_estimated = fields.Bool(missing=False)
     artist_name_list = fields.List(fields.Str(), load_from='artist')
     album_name_list = fields.List(fields.Str(), load_from='album')
+    track_number_list = fields.List(fields.Str(), load_from='tracknumber')
+    disc_number_list = fields.List(fields.Str(), load_from='discnumber')
 
     @post_load
     def create_song_model(self, data):
@@ -24,19 +57,32 @@ class EasyMP3MetadataSongSchema(Schema):
         title = title_list[0] if title_list else 'Unknown'
         artist_name_list = data.get('artist_name_list', [])
         album_name_list = data.get('album_name_list', [])
-        identifier = str(elfhash(base64.b64encode(bytes(data['url'], 'utf-8'))))
-        song_data = {
-            'source': SOURCE,
-            'identifier': identifier,
-            'title': title,
-            'duration': data['duration'],
-            'url': data['url'],
-            'artists': [{'name': name, 'identifier': name, 'source': SOURCE}
-                        for name in artist_name_list]
-        }
+        track_number_list = data.get('track_number_list') or ['']
+        disc_number_list = data.get('disc_number_list') or ['']
+        identifier = gen_identifier(data['url'])
+        # albums and artists are merged by identifier when library is setup,
+        # see :meth:`fuocore.local.provider.LocalProvider.setup_library`
+        artists = [LArtistModel(source=SOURCE, identifier=name, name=name)
+                   for name in artist_name_list]
         if album_name_list:
-            song_data['album'] = {'name': album_name_list[0],
-                                  'identifier': album_name_list[0],
-                                  'source': SOURCE}
-        song, _ = SongSchema(strict=True).load(song_data)
-        return song
+            album = LAlbumModel(source=SOURCE,
+                                identifier=album_name_list[0],
+                                name=album_name_list[0])
+        else:
+            album = None
+        return LSongModel(
+            source=SOURCE,
+            identifier=identifier,
+            title=title,
+            duration=data['duration'],
+            duration_estimated=data['duration_estimated'],
+            url=data['url'],
+            artists=artists,
+            album=album,
+            track=parse_number(track_number_list[0]),
+            disc=parse_number(disc_number_list[0]),
+        )
+
+
+# import loop
+from .provider import LAlbumModel, LArtistModel, LSongModel  # noqa
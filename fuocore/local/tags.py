@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+
+"""
+fuocore.local.tags
+~~~~~~~~~~~~~~~~~~
+
+读取本地音乐文件的元数据（标签和时长）。
+
+``mutagen.File`` 会让每种格式都检测一遍文件头，再决定用哪种格式解析。
+这里根据文件扩展名直接选择对应格式的解析器，这些解析器只读取文件头部的
+元数据块（FLAC/Vorbis comment/MP4 atom/ID3），不会读取整个文件。
+扩展名和内容不符时，再退回到 ``mutagen.File``。
+
+解析结果统一为 EasyMP3 风格的 dict::
+
+    {'title': ['xxx'], 'artist': ['xxx'], 'album': ['xxx'],
+     'tracknumber': ['1/10'], 'discnumber': ['1'], 'duration': 1000.0}
+
+其中 duration 的单位为毫秒。
+
+快速模式（``fast=True``）用于扫描大量文件（比如 NAS 上的音乐库）：
+MP3 文件通过 mmap 只读取开头的 ID3v2 标签和第一个 MPEG 帧，以及末尾的
+ID3v1 标签，时长从 Xing/VBRI 头中得到，没有这些头时根据码率估算，
+这时 metadata 中 ``duration_estimated`` 为 True，精确时长可以之后
+再用 :func:`read_metadata` 计算。
+"""
+
+import logging
+import mmap
+import os
+
+import mutagen
+from mutagen import MutagenError
+from mutagen.easyid3 import EasyID3
+from mutagen.flac import FLAC
+from mutagen.id3 import ID3NoHeaderError
+from mutagen.mp3 import EasyMP3
+from mutagen.mp4 import MP4
+from mutagen.oggopus import OggOpus
+from mutagen.oggvorbis import OggVorbis
+
+
+logger = logging.getLogger(__name__)
+
+#: keys that we care about
+KEYS = ('title', 'artist', 'album', 'tracknumber', 'discnumber')
+
+_MP4_KEY_MAP = {
+    '\xa9nam': 'title',
+    '\xa9ART': 'artist',
+    '\xa9alb': 'album',
+    'trkn': 'tracknumber',
+    'disk': 'discnumber',
+}
+
+
+def _metadata(tags, length):
+    metadata = {key: tags[key] for key in KEYS if key in tags}
+    metadata['duration'] = length * 1000  # milliseconds
+    return metadata
+
+
+def read_id3(fpath):
+    audio = EasyMP3(fpath)
+    return _metadata(audio, audio.info.length)
+
+
+def _read_vorbis_comment(cls):
+    def read(fpath):
+        audio = cls(fpath)
+        # vorbis comment keys are case insensitive
+        tags = audio.tags.as_dict() if audio.tags is not None else {}
+        return _metadata(tags, audio.info.length)
+    read.__name__ = 'read_' + cls.__name__.lower()
+    return read
+
+
+read_flac = _read_vorbis_comment(FLAC)
+read_ogg_vorbis = _read_vorbis_comment(OggVorbis)
+read_ogg_opus = _read_vorbis_comment(OggOpus)
+
+
+def read_mp4(fpath):
+    audio = MP4(fpath)
+    tags = {}
+    for key, value in (audio.tags or {}).items():
+        name = _MP4_KEY_MAP.get(key)
+        if name is None:
+            continue
+        if name in ('tracknumber', 'discnumber'):
+            # [(number, total)]
+            value = ['{}/{}'.format(*each) if each[1] else str(each[0])
+                     for each in value]
+        tags[name] = value
+    return _metadata(tags, audio.info.length)
+
+
+# MPEG audio layer III frame header
+# https://www.mp3-tech.org/programmer/frame_header.html
+_MPEG1_BITRATES = (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224,
+                   256, 320)
+_MPEG2_BITRATES = (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144,
+                   160)
+_SAMPLE_RATES = {
+    3: (44100, 48000, 32000),  # MPEG1
+    2: (22050, 24000, 16000),  # MPEG2
+    0: (11025, 12000, 8000),  # MPEG2.5
+}
+#: how many bytes to search for the first frame after ID3v2 tag
+_SYNC_SEARCH_SIZE = 64 * 1024
+
+
+def _id3v2_size(buf):
+    """size of ID3v2 tag at the beginning of buf, 0 if there is no tag"""
+    if len(buf) < 10 or buf[:3] != b'ID3':
+        return 0
+    # syncsafe integer: 7 bits per byte
+    size = 0
+    for byte in buf[6:10]:
+        size = (size << 7) | (byte & 0x7f)
+    footer = 10 if buf[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def _parse_frame_header(buf, pos):
+    """
+    :return: (frame_length, samples_per_frame, sample_rate, bitrate, version,
+        channel_mode), None if it is not a valid layer III frame header
+    """
+    if pos + 4 > len(buf):
+        return None
+    b0, b1, b2, b3 = buf[pos:pos + 4]
+    if b0 != 0xff or b1 & 0xe0 != 0xe0:
+        return None
+    version = (b1 >> 3) & 0x03
+    layer = (b1 >> 1) & 0x03
+    bitrate_index = b2 >> 4
+    sample_rate_index = (b2 >> 2) & 0x03
+    if version == 1 or layer != 1 or bitrate_index in (0, 15) or \
+            sample_rate_index == 3:
+        return None
+    padding = (b2 >> 1) & 0x01
+    sample_rate = _SAMPLE_RATES[version][sample_rate_index]
+    if version == 3:
+        bitrate = _MPEG1_BITRATES[bitrate_index] * 1000
+        samples_per_frame = 1152
+    else:
+        bitrate = _MPEG2_BITRATES[bitrate_index] * 1000
+        samples_per_frame = 576
+    frame_length = samples_per_frame // 8 * bitrate // sample_rate + padding
+    return (frame_length, samples_per_frame, sample_rate, bitrate, version,
+            b3 >> 6)
+
+
+def _find_first_frame(buf, start):
+    end = min(len(buf), start + _SYNC_SEARCH_SIZE)
+    pos = buf.find(b'\xff', start, end)
+    while pos != -1:
+        header = _parse_frame_header(buf, pos)
+        # check next frame to avoid false sync
+        if header is not None and (
+                pos + header[0] + 4 > len(buf) or
+                _parse_frame_header(buf, pos + header[0]) is not None):
+            return pos, header
+        pos = buf.find(b'\xff', pos + 1, end)
+    return None, None
+
+
+def _mpeg_duration(buf, start, end):
+    """get duration (seconds) of MPEG audio in buf[start:end]
+
+    :return: (duration, estimated), (None, True) if no frame is found
+    """
+    pos, header = _find_first_frame(buf, start)
+    if pos is None:
+        return None, True
+    _, samples_per_frame, sample_rate, bitrate, version, channel_mode = header
+
+    # Xing/Info header is stored in side information of first frame
+    mono = channel_mode == 3
+    if version == 3:
+        xing_pos = pos + 4 + (17 if mono else 32)
+    else:
+        xing_pos = pos + 4 + (9 if mono else 17)
+    if buf[xing_pos:xing_pos + 4] in (b'Xing', b'Info'):
+        flags = int.from_bytes(buf[xing_pos + 4:xing_pos + 8], 'big')
+        if flags & 0x01:
+            frames = int.from_bytes(buf[xing_pos + 8:xing_pos + 12], 'big')
+            return frames * samples_per_frame / sample_rate, False
+    vbri_pos = pos + 4 + 32
+    if buf[vbri_pos:vbri_pos + 4] == b'VBRI':
+        frames = int.from_bytes(buf[vbri_pos + 14:vbri_pos + 18], 'big')
+        return frames * samples_per_frame / sample_rate, False
+
+    # assume it is CBR
+    return (end - pos) * 8 / bitrate, True
+
+
+def read_id3_fast(fpath):
+    """read ID3 tags and get duration without parsing MPEG frames"""
+    with open(fpath, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            raise MutagenError('Empty file: {}'.format(fpath))
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            start = _id3v2_size(buf)
+            end = size - 128 if buf[-128:-125] == b'TAG' else size
+            duration, estimated = _mpeg_duration(buf, start, end)
+            if duration is None:
+                raise MutagenError('No MPEG frame found: {}'.format(fpath))
+            try:
+                tags = EasyID3(buf)
+            except ID3NoHeaderError:
+                tags = {}
+    metadata = _metadata(tags, duration)
+    metadata['duration_estimated'] = estimated
+    return metadata
+
+
+def read_any(fpath):
+    """detect file format by mutagen, it is slower"""
+    audio = mutagen.File(fpath, easy=True)
+    if audio is None:
+        raise MutagenError('Unknown file format: {}'.format(fpath))
+    if audio.tags is None:
+        tags = {}
+    elif hasattr(audio.tags, 'as_dict'):
+        tags = audio.tags.as_dict()
+    else:
+        tags = dict(audio.tags)
+    return _metadata(tags, audio.info.length)
+
+
+#: {extension: reader}
+READERS = {
+    'mp3': read_id3,
+    'flac': read_flac,
+    'ogg': read_ogg_vorbis,
+    'oga': read_ogg_vorbis,
+    'opus': read_ogg_opus,
+    'm4a': read_mp4,
+    'mp4': read_mp4,
+}
+
+#: readers used in fast mode, formats which are not listed here use
+#: :data:`READERS`, since their readers read only headers already
+FAST_READERS = {
+    'mp3': read_id3_fast,
+}
+
+#: extensions of supported music files
+EXTS = tuple(READERS)
+
+
+def read_metadata(fpath, fast=False):
+    """read metadata of a music file
+
+    :param fast: read with limited bytes, duration may be estimated
+    :return: metadata dict, see module docstring
+    :raise MutagenError: file can not be parsed
+    """
+    ext = fpath.rsplit('.', 1)[-1].lower()
+    reader = (fast and FAST_READERS.get(ext)) or READERS.get(ext)
+    if reader is not None:
+        try:
+            return reader(fpath)
+        except MutagenError:
+            # extension may be wrong, for example, a .ogg file is an opus
+            logger.debug('Read {} with {} failed, detect its format.'
+                         .format(fpath, reader.__name__))
+    return read_any(fpath)
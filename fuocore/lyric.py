@@ -1,6 +1,52 @@
 # -*- coding: utf-8 -*-
 
+from array import array
+import json
+import logging
+import os
 import re
+from urllib.parse import quote
+
+
+logger = logging.getLogger(__name__)
+
+
+_TIMESTAMP_PATTERN = re.compile(r'\[(\d+(?::\d+){0,2}(?:\.\d+)?)\]')
+
+
+def _to_milliseconds(time_str):
+    """
+    >>> _to_milliseconds('01:02.50')
+    62500.0
+    """
+    milliseconds = 0
+    unit = 1000
+    for num in reversed(time_str.split(':')):
+        milliseconds += float(num) * unit
+        unit *= 60
+    return milliseconds
+
+
+def _iter_sentences(content):
+    """yield (milliseconds, sentence) for each timestamp
+
+    One line may have many timestamps, such as ``[00:01.00][00:30.00]xxx``,
+    which means the sentence appears many times.
+    """
+    search = _TIMESTAMP_PATTERN.search
+    match = _TIMESTAMP_PATTERN.match
+    for line in content.splitlines():
+        m = search(line)
+        if m is None:
+            continue
+        time_strs = []
+        while m is not None:
+            time_strs.append(m.group(1))
+            end = m.end()
+            m = match(line, end)
+        sentence = line[end:]
+        for time_str in time_strs:
+            yield _to_milliseconds(time_str), sentence
 
 
 def parse(content):
@@ -10,20 +56,104 @@ def parse(content):
     >>> parse("[00:00.00] 作曲 : 周杰伦\\n[00:01.00] 作词 : 周杰伦\\n")
     {0.0: ' 作曲 : 周杰伦', 1000.0: ' 作词 : 周杰伦'}
     """
-    ms_sentence_map = dict()
-    sentence_pattern = re.compile(r'\[(\d+(:\d+){0,2}(\.\d+)?)\]')
-    lines = content.splitlines()
-    for line in lines:
-        m = sentence_pattern.search(line, 0)
-        if m:
-            time_str = m.group(1)
-            mileseconds = 0
-            unit = 1000
-            t_seq = time_str.split(':')
-            t_seq.reverse()
-            for num in t_seq:
-                mileseconds += float(num) * unit
-                unit *= 60
-            sentence = line[m.end():]
-            ms_sentence_map[mileseconds] = sentence
-    return ms_sentence_map
+    return dict(_iter_sentences(content))
+
+
+class Timeline(object):
+    """parsed lyric
+
+    ``positions`` are sorted timestamps (milliseconds) and ``sentences[i]``
+    is the sentence at ``positions[i]``, parallel arrays are much smaller
+    than a dict of floats and can be searched by bisect directly.
+
+    If lyric has a translation, ``translations[i]`` is the translation
+    of ``sentences[i]`` ('' if it is not translated), otherwise
+    ``translations`` is None.
+    """
+
+    __slots__ = ('positions', 'sentences', 'translations')
+
+    def __init__(self, positions=None, sentences=None, translations=None):
+        self.positions = positions if positions is not None else array('d')
+        self.sentences = sentences if sentences is not None else []
+        self.translations = translations
+
+    def __len__(self):
+        return len(self.positions)
+
+
+def parse_timeline(content, trans_content=None):
+    """parse lrc content into a :class:`Timeline`
+
+    When there are duplicate timestamps, the last sentence wins,
+    which is the same as :func:`parse`. Translation sentences are
+    aligned with original sentences by timestamp.
+
+    >>> timeline = parse_timeline('[00:30.00][00:01.00]hello\\n'
+    ...                           '[00:02.00]world')
+    >>> list(timeline.positions), timeline.sentences
+    ([1000.0, 2000.0, 30000.0], ['hello', 'world', 'hello'])
+    >>> timeline = parse_timeline('[00:01.00]hello\\n[00:02.00]world',
+    ...                           '[by:xxx]\\n[00:01.00]你好')
+    >>> timeline.translations
+    ['你好', '']
+    """
+    ms_sentence_map = parse(content)
+    positions = sorted(ms_sentence_map)
+    sentences = [ms_sentence_map[ms] for ms in positions]
+    translations = None
+    if trans_content:
+        ms_trans_map = parse(trans_content)
+        if ms_trans_map:
+            translations = [ms_trans_map.get(ms, '') for ms in positions]
+    return Timeline(array('d', positions), sentences, translations)
+
+
+class LyricCache(object):
+    """lyric cache on disk, lyric of each song is saved in a json file
+
+    Fetching lyric from provider may take a long time, so it is cached
+    by song key, the lyric of a song is rarely changed.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _path(self, song):
+        source, model_type, identifier = song.key
+        filename = '{}-{}.json'.format(quote(str(source), safe=''),
+                                       quote(str(identifier), safe=''))
+        return os.path.join(self.directory, filename)
+
+    def get(self, song):
+        """
+        :return: (content, trans_content), None if not cached
+        """
+        try:
+            with open(self._path(song), encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            logger.exception('Read lyric cache of {} failed.'.format(song))
+            return None
+        return data.get('content', ''), data.get('trans_content', '')
+
+    def set(self, song, content, trans_content=''):
+        """cache lyric of song, empty content is not cached
+
+        Content may be empty because provider returns an error, such as
+        netease returns ``{'code': -460}``, it should be fetched again.
+        """
+        if not content:
+            return
+        path = self._path(song)
+        tmp_path = path + '.tmp'
+        data = {'content': content, 'trans_content': trans_content or ''}
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError:
+            logger.exception('Write lyric cache of {} failed.'.format(song))
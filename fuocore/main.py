@@ -9,13 +9,10 @@ main.py
 import argparse
 import asyncio
 import logging
-from fuocore import MpvPlayer
+from fuocore.player import MpvPlayer, NullPlayer
 from fuocore.app import CliAppMixin, run_server
 from fuocore.pubsub import run as run_pubsub
 from fuocore.library import Library
-from fuocore.local.provider import provider as lp
-from fuocore.netease.provider import provider as np
-from fuocore.qqmusic.provider import provider as qp
 
 
 logger = logging.getLogger()
@@ -75,11 +72,39 @@ def setup_logger(debug=True):
         logging.config.dictConfig(dict_config)
 
 
+def setup_library():
+    """provider 在第一次使用时才导入，避免拖慢启动"""
+    library = Library()
+    library.register_lazy('local', 'fuocore.local.provider:provider')
+    library.register_lazy('netease', 'fuocore.netease.provider:provider')
+    library.register_lazy('qqmusic', 'fuocore.qqmusic.provider:provider')
+    return library
+
+
+def load_local_library(library):
+    """扫描本地音乐，它比较耗时，应该在后台线程中运行
+
+    先用快速模式扫描，让歌曲尽快可用，之后再计算那些估算出来的时长。
+    """
+    provider = library.get('local')
+    if provider is not None:
+        provider.load(fast=True)
+        provider.update_durations()
+
+
 def setup_argparse():
     parser = argparse.ArgumentParser(description='运行 fuo 播放服务')
     parser.add_argument('-d', '--debug', action='store_true', default=False,
                         help='开启调试模式')
 
+    parser.add_argument(
+        '--player',
+        choices=['mpv', 'null'],
+        default='mpv',
+        help='播放器，null 播放器不输出声音，只模拟播放进度，'
+             '可以用于压力测试，或者在没有 libmpv 的机器上运行服务'
+    )
+
     # XXX: 不知道能否加一个基于 regex 的 option？比如加一个
     # `--mpv-*` 的 option，否则每个 mpv 配置我都需要写一个 option？
 
@@ -101,12 +126,12 @@ def main():
 
     setup_logger(debug=debug)
 
-    player = MpvPlayer(audio_device=bytes(mpv_audio_device, 'utf-8'))
+    if args.player == 'null':
+        player = NullPlayer()
+    else:
+        player = MpvPlayer(audio_device=bytes(mpv_audio_device, 'utf-8'))
     player.initialize()
-    library = Library()
-    library.register(lp)
-    library.register(np)
-    library.register(qp)
+    library = setup_library()
 
     pubsub_gateway, pubsub_server = run_pubsub()
 
@@ -115,6 +140,7 @@ def main():
     live_lyric = app.live_lyric
     event_loop = asyncio.get_event_loop()
     event_loop.create_task(run_server(app, live_lyric))
+    event_loop.run_in_executor(None, load_local_library, library)
     try:
         event_loop.run_forever()
         logger.info('Event loop stopped.')
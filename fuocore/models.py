@@ -8,6 +8,10 @@ fuocore.model
 """
 
 from enum import Enum
+import logging
+
+
+logger = logging.getLogger(__name__)
 
 
 class ModelType(Enum):
@@ -39,21 +43,107 @@ class ModelMetadata(object):
                  fields=None,
                  allow_get=False,
                  allow_batch=False,
+                 slots=False,
                  **kwargs):
         """Model metadata class
 
         :param allow_get: if get method is implemented
         :param allow_batch: if list method is implemented
+        :param slots: if generate ``__slots__`` from fields. Note that a
+            class can not inherit from two bases which both have slots.
         """
         self.model_type = model_type
         self.provider = provider
         self.fields = fields
         self.allow_get = allow_get
         self.allow_batch = allow_batch
+        self.slots = slots
         for key, value in kwargs.items():
             setattr(self, key, value)
 
 
+def _generate_slots(fields, bases, attrs):
+    """generate ``__slots__`` for fields which are not slots of bases
+
+    If a field is overridden by a property, the property usually stores
+    the value in ``_{field}``, so we reserve a slot for it. Extra slots
+    can be declared with ``__slots__`` in class body.
+    """
+    base_slots = set()
+    for base in bases:
+        for klass in base.__mro__:
+            base_slots.update(klass.__dict__.get('__slots__', ()))
+
+    slots = set(attrs.get('__slots__', ()))
+    for field in fields:
+        if field in attrs:
+            slots.add('_' + field)
+        else:
+            slots.add(field)
+    return tuple(sorted(slots - base_slots))
+
+
+class DetailField(object):
+    """descriptor for fields which are fetched lazily
+
+    Fields in model class ``_detail_fields`` are turned into this descriptor
+    by :class:`ModelMeta`. When the field value is None, model detail is
+    fetched by ``Model.get`` and all detail fields are updated. Other fields
+    are plain attributes, so accessing them costs nothing extra.
+    """
+
+    def __init__(self, name, storage=None):
+        """
+        :param storage: descriptor which actually stores the value,
+            such as a slot. If it is None, value is stored in ``__dict__``.
+        """
+        self.name = name
+        self.storage = storage
+
+    def get_raw(self, instance):
+        if self.storage is None:
+            return instance.__dict__.get(self.name)
+        return self.storage.__get__(instance, type(instance))
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        value = self.get_raw(instance)
+        if value is None:
+            logger.debug('Field %s value is None, get model detail first.'
+                         % self.name)
+            cls = type(instance)
+            obj = cls.get(instance.identifier)
+            if obj is None:
+                return None
+            for field in cls._detail_fields:
+                setattr(instance, field, getattr(cls, field).get_raw(obj))
+            value = self.get_raw(instance)
+        return value
+
+    def __set__(self, instance, value):
+        if self.storage is None:
+            instance.__dict__[self.name] = value
+        else:
+            self.storage.__set__(instance, value)
+
+
+def _find_storage(klass, name):
+    """find the descriptor (slot) which stores the field value
+
+    The slot may be generated for klass itself, or be inherited. If the
+    field is a :class:`DetailField` of parent class, use its storage,
+    otherwise the parent's lazy fetch may be triggered by ``get_raw``.
+    """
+    for base in klass.__mro__:
+        if name in base.__dict__:
+            storage = base.__dict__[name]
+            if isinstance(storage, DetailField):
+                return storage.storage
+            return storage
+    return None
+
+
 class ModelMeta(type):
     def __new__(cls, name, bases, attrs):
         # get all meta
@@ -82,6 +172,10 @@ class ModelMeta(type):
                 else:
                     meta_kv[k] = v
 
+        fields = list(set(fields))
+        if meta_kv.get('slots', False):
+            attrs['__slots__'] = _generate_slots(fields, bases, attrs)
+
         klass = type.__new__(cls, name, bases, attrs)
 
         # update provider
@@ -90,11 +184,15 @@ class ModelMeta(type):
         if provider and ModelType(model_type) != ModelType.dummy:
             model_name = _TYPE_NAME_MAP[ModelType(model_type)]
             setattr(provider, model_name, klass)
-        fields = list(set(fields))
         klass._meta = ModelMetadata(model_type=model_type,
                                     provider=provider,
                                     fields=fields,
                                     **meta_kv)
+
+        # fields in _detail_fields are fetched lazily
+        for field in attrs.get('_detail_fields', ()):
+            storage = _find_storage(klass, field)
+            setattr(klass, field, DetailField(field, storage))
         return klass
 
 
@@ -111,6 +209,8 @@ class Model(object, metaclass=ModelMeta):
         assert user2.name = 'xxx'
     """
 
+    __slots__ = ()
+
     def __init__(self, obj=None, **kwargs):
         for field in self._meta.fields:
             setattr(self, field, getattr(obj, field, None))
@@ -121,19 +221,55 @@ class Model(object, metaclass=ModelMeta):
 
 
 class BaseModel(Model):
+    """base class for music models
+
+    Music models use ``__slots__`` instead of ``__dict__`` to save memory,
+    since there may be a large number of songs in library.
+    """
+
     class Meta:
         model_type = ModelType.dummy.value
         fields = ['source', 'identifier']
+        slots = True
+
+    # _key: 缓存 :attr:`key`，source 或 identifier 变化时失效
+    # _display_cache: 缓存模型的展示文本，字段值发生变化时失效，
+    # 见 :func:`fuocore.protocol.handlers.helpers.show_song`
+    __slots__ = ('_key', '_display_cache', )
 
     def __init__(self, *args, **kwargs):
+        object.__setattr__(self, '_key', None)
+        object.__setattr__(self, '_display_cache', None)
         super().__init__(*args, **kwargs)
 
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        if name == 'identifier' or name == 'source':
+            object.__setattr__(self, '_key', None)
+        if self._display_cache is not None and name in self._meta.fields:
+            object.__setattr__(self, '_display_cache', None)
+
+    @property
+    def key(self):
+        """(source, model_type, identifier), which identifies a model
+
+        Models are hashable and compared by key, so they can be used in
+        set and dict. Do not change source and identifier of a model
+        after it is put into a set or dict.
+        """
+        key = self._key
+        if key is None:
+            key = (self.source, self._meta.model_type, self.identifier)
+            object.__setattr__(self, '_key', key)
+        return key
+
     def __eq__(self, other):
         if not isinstance(other, BaseModel):
             return False
-        return all([other.source == self.source,
-                    other.identifier == self.identifier,
-                    other._meta.model_type == self._meta.model_type])
+        return self.key == other.key
+
+    def __hash__(self):
+        return hash(self.key)
 
     @classmethod
     def get(cls, identifier):
@@ -194,10 +330,6 @@ class SongModel(BaseModel):
     def __str__(self):
         return 'fuo://{}/songs/{}'.format(self.source, self.identifier)  # noqa
 
-    def __eq__(self, other):
-        return all([other.source == self.source,
-                    other.identifier == self.identifier])
-
 
 class PlaylistModel(BaseModel):
     class Meta:
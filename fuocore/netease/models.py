@@ -22,6 +22,7 @@ MUSIC_LIBRARY_PATH = os.path.expanduser('~') + '/Music'
 
 class NBaseModel(BaseModel):
     # FIXME: remove _detail_fields and _api to Meta
+    # NOTE: fields in _detail_fields are fetched lazily, see DetailField
     _detail_fields = ()
     _api = provider.api
 
@@ -29,34 +30,21 @@ class NBaseModel(BaseModel):
         allow_get = True
         provider = provider
 
-    def __getattribute__(self, name):
-        cls = type(self)
-        value = object.__getattribute__(self, name)
-        if name in cls._detail_fields and value is None:
-            logger.debug('Field %s value is None, get model detail first.' % name)
-            obj = cls.get(self.identifier)
-            for field in cls._detail_fields:
-                setattr(self, field, getattr(obj, field))
-            value = object.__getattribute__(self, name)
-        elif name in cls._detail_fields and not value:
-            logger.warning('Field %s value is not None, but is %s' % (name, value))
-        return value
-
 
 class NSongModel(SongModel, NBaseModel):
+    __slots__ = ('_expired_at', )
+
     @classmethod
     def get(cls, identifier):
         data = cls._api.song_detail(int(identifier))
-        song, _ = NeteaseSongSchema(strict=True).load(data)
-        return song
+        return load_song(data)
 
     @classmethod
     def list(cls, identifiers):
         song_data_list = cls._api.songs_detail(identifiers)
         songs = []
         for song_data in song_data_list:
-            song, _ = NeteaseSongSchema(strict=True).load(song_data)
-            songs.append(song)
+            songs.append(load_song(song_data))
         return songs
 
     def _refresh_url(self):
@@ -120,12 +108,13 @@ class NSongModel(SongModel, NBaseModel):
             assert isinstance(self._lyric, LyricModel)
             return self._lyric
         data = self._api.get_lyric_by_songid(self.identifier)
-        lrc = data.get('lrc', {})
-        lyric = lrc.get('lyric', '')
+        lrc = data.get('lrc') or {}
+        tlyric = data.get('tlyric') or {}
         self._lyric = LyricModel(
             identifier=self.identifier,
             source=self.source,
-            content=lyric
+            content=lrc.get('lyric') or '',
+            trans_content=tlyric.get('lyric') or ''
         )
         return self._lyric
 
@@ -182,13 +171,12 @@ class NPlaylistModel(PlaylistModel, NBaseModel):
     _detail_fields = ('songs', )
 
     class Meta:
-        fields = ('uid')
+        fields = ('uid', )
 
     @classmethod
     def get(cls, identifier):
         data = cls._api.playlist_detail(identifier)
-        playlist, _ = NeteasePlaylistSchema(strict=True).load(data)
-        return playlist
+        return load_playlist(data)
 
     def add(self, song_id, allow_exist=True):
         rv = self._api.op_music_to_playlist(song_id, self.identifier, 'add')
@@ -243,18 +231,16 @@ def search(keyword, **kwargs):
     if _songs:
         for song in _songs:
             id_song_map[str(song['id'])] = song
-            schema = NeteaseSongSchema(strict=True)
-            s, _ = schema.load(song)
-            songs.append(s)
+            songs.append(load_song(song))
     return NSearchModel(q=keyword, songs=songs,
                         source=provider.identifier)
 
 
 # import loop
 from .schemas import (
-    NeteaseSongSchema,
     NeteaseAlbumSchema,
     NeteaseArtistSchema,
-    NeteasePlaylistSchema,
     NeteaseUserSchema,
+    load_playlist,
+    load_song,
 )  # noqa
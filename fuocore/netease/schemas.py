@@ -6,6 +6,7 @@ from fuocore.schemas import (
     PlaylistSchema,
     SongSchema,
     UserSchema,
+    compile_loader,
 )
 from fuocore.models import UserModel
 
@@ -98,6 +99,12 @@ class NeteaseUserSchema(Schema):
         return NUserModel(**data)
 
 
+# 热点路径（搜索、歌单、批量获取歌曲）使用编译版的 loader，
+# 见 :func:`fuocore.schemas.compile_loader`
+load_song = compile_loader(NeteaseSongSchema)
+load_playlist = compile_loader(NeteasePlaylistSchema)
+
+
 from .models import NAlbumModel
 from .models import NArtistModel
 from .models import NPlaylistModel
@@ -6,6 +6,8 @@
 
 该模块提供了 :class:`.AbstractPlayer` 抽象基类，并基于 mpv(libmpv) 播放器实现了
 :class:`.MpvPlayer`，随之也提供了 :class:`.Playlist` 用于管理播放列表。
+:class:`.NullPlayer` 不输出声音，只模拟播放进度，可以用于压力测试，
+或者在没有 libmpv 的机器上运行服务。
 
 
 **简单使用示例**
@@ -22,9 +24,8 @@ from abc import ABCMeta, abstractmethod
 from enum import Enum
 import logging
 import random
-
-from mpv import MPV, MpvEventID, MpvEventEndFile, \
-    _mpv_set_property_string
+import threading
+import time
 
 from fuocore.dispatch import Signal
 
@@ -65,8 +66,10 @@ class Playlist(object):
         :param playback_mode: :class:`fuocore.player.PlaybackMode`
         """
         self._current_song = None
-        self._bad_songs = []  # songs whose url is invalid
+        self._bad_songs = set()  # songs whose url is invalid
         self._songs = songs or []
+        # songs are hashable, use a set to check if song is in playlist
+        self._song_set = set(self._songs)
 
         self._playback_mode = playback_mode
 
@@ -84,17 +87,18 @@ class Playlist(object):
         return self._songs[index]
 
     def mark_as_bad(self, song):
-        if song in self._songs and song not in self._bad_songs:
-            self._bad_songs.append(song)
+        if song in self._song_set:
+            self._bad_songs.add(song)
 
     def add(self, song):
         """Insert a song after current song
 
         If current song is None, append to end.
         """
-        if song in self._songs:
+        if song in self._song_set:
             return
 
+        self._song_set.add(song)
         if self._current_song is None:
             self._songs.append(song)
         else:
@@ -108,7 +112,7 @@ class Playlist(object):
         If song is current song, remove the song and play next. Otherwise,
         just remove it.
         """
-        if song in self._songs:
+        if song in self._song_set:
             if self._current_song is None:
                 self._songs.remove(song)
             elif song == self._current_song:
@@ -116,18 +120,19 @@ class Playlist(object):
                 self._songs.remove(song)
             else:
                 self._songs.remove(song)
+            self._song_set.discard(song)
             logger.debug('Remove {} from player playlist'.format(song))
         else:
             logger.debug('Remove failed: {} not in playlist'.format(song))
 
-        if song in self._bad_songs:
-            self._bad_songs.remove(song)
+        self._bad_songs.discard(song)
 
     def clear(self):
         """清空播放列表"""
 
         self.current_song = None
         self._songs = []
+        self._song_set.clear()
         self._bad_songs.clear()
 
     def list(self):
@@ -147,7 +152,7 @@ class Playlist(object):
         if song is None:
             self._current_song = None
         # add it to playlist if song not in playlist
-        elif song in self._songs:
+        elif song in self._song_set:
             self._current_song = song
         else:
             self.add(song)
@@ -181,12 +186,12 @@ class Playlist(object):
         1
         >>> pl._get_good_song(base=1)
         2
-        >>> pl._bad_songs = [2]
+        >>> pl._bad_songs = {2}
         >>> pl._get_good_song(base=1, direction=-1)
         1
         >>> pl._get_good_song(base=1)
         3
-        >>> pl._bad_songs = [1, 2, 3]
+        >>> pl._bad_songs = {1, 2, 3}
         >>> pl._get_good_song()
         """
         if not self._songs or len(self._songs) <= len(self._bad_songs):
@@ -249,8 +254,17 @@ class Playlist(object):
 class AbstractPlayer(metaclass=ABCMeta):
     """Player abstrace base class"""
 
-    def __init__(self, playlist=Playlist(), **kwargs):
+    def __init__(self, playlist=Playlist(), position_interval=0.1, **kwargs):
+        """
+        :param position_interval: ``position_changed`` 信号的最小发送间隔
+            （单位为秒），0 表示每次位置变化都发送信号。
+            播放器 seek 或者状态变化时，总是会发送信号。
+        """
         self._position = 0  # seconds
+        self._position_interval = position_interval
+        self._position_emitted_at = 0  # monotonic time of last emit
+        self._position_pending = False  # a position change is not emitted
+        self._position_force_emit = True
         self._volume = 100  # (0, 100)
         self._playlist = playlist
         self._state = State.stopped
@@ -261,6 +275,7 @@ class AbstractPlayer(metaclass=ABCMeta):
         self.song_finished = Signal()
         self.duration_changed = Signal()
         self.media_changed = Signal()
+        self.volume_changed = Signal()
 
     @property
     def state(self):
@@ -274,6 +289,10 @@ class AbstractPlayer(metaclass=ABCMeta):
     def state(self, value):
         self._state = value
         self.state_changed.emit(value)
+        # let subscribers know the exact position where state changed
+        if self._position_pending:
+            self._emit_position_changed(self._position, force=True)
+        self._position_force_emit = True
 
     @property
     def current_song(self):
@@ -308,7 +327,9 @@ class AbstractPlayer(metaclass=ABCMeta):
     def volume(self, value):
         value = 0 if value < 0 else value
         value = 100 if value > 100 else value
-        self._volume = value
+        if value != self._volume:
+            self._volume = value
+            self.volume_changed.emit(value)
 
     @property
     def duration(self):
@@ -321,6 +342,23 @@ class AbstractPlayer(metaclass=ABCMeta):
             self._duration = value
             self.duration_changed.emit(value)
 
+    def _emit_position_changed(self, position, force=False):
+        """emit ``position_changed`` at most once per ``position_interval``
+
+        Position changes in the interval are coalesced, the latest position
+        will be emitted when next interval begins or player state changes.
+        """
+        self._position = position
+        now = time.monotonic()
+        if force or self._position_force_emit or \
+                now - self._position_emitted_at >= self._position_interval:
+            self._position_emitted_at = now
+            self._position_pending = False
+            self._position_force_emit = False
+            self.position_changed.emit(position)
+        else:
+            self._position_pending = True
+
     @abstractmethod
     def play(self, url):
         """play media
@@ -368,9 +406,19 @@ class MpvPlayer(AbstractPlayer):
     playlist ``song_changed`` signal and change the current playback.
 
     TODO: make me singleton
+
+    NOTE: mpv.py loads libmpv when it is imported, which is slow and fails
+    on hosts without libmpv, so it is imported when player is created.
     """
     def __init__(self, audio_device=b'auto', *args, **kwargs):
-        super(MpvPlayer, self).__init__()
+        from mpv import (
+            MPV, MpvEventEndFile, MpvEventID, _mpv_set_property_string)
+
+        super(MpvPlayer, self).__init__(**kwargs)
+        # keep the constants, so that mpv is not imported on each event
+        self._seek_event_id = MpvEventID.SEEK
+        self._end_file_event_id = MpvEventID.END_FILE
+        self._end_file_aborted = MpvEventEndFile.ABORTED
         self._mpv = MPV(ytdl=False,
                         input_default_bindings=True,
                         input_vo_keyboard=True)
@@ -381,13 +429,18 @@ class MpvPlayer(AbstractPlayer):
         self._playlist.song_changed.connect(self._on_song_changed)
 
     def initialize(self):
+        from mpv import MpvFormat
+
+        # observe with native format to avoid parsing string on every change
         self._mpv.observe_property(
             'time-pos',
-            lambda name, position: self._on_position_changed(position)
+            lambda name, position: self._on_position_changed(position),
+            MpvFormat.DOUBLE
         )
         self._mpv.observe_property(
             'duration',
-            lambda name, duration: self._on_duration_changed(duration)
+            lambda name, duration: self._on_duration_changed(duration),
+            MpvFormat.DOUBLE
         )
         # self._mpv.register_event_callback(lambda event: self._on_event(event))
         self._mpv.event_callbacks.append(self._on_event)
@@ -459,6 +512,7 @@ class MpvPlayer(AbstractPlayer):
     def position(self, position):
         self._mpv.seek(position, reference='absolute')
         self._position = position
+        self._position_force_emit = True
 
     @AbstractPlayer.volume.setter
     def volume(self, value):
@@ -466,8 +520,7 @@ class MpvPlayer(AbstractPlayer):
         self._mpv.volume = self.volume
 
     def _on_position_changed(self, position):
-        self._position = position
-        self.position_changed.emit(position)
+        self._emit_position_changed(position)
 
     def _on_duration_changed(self, duration):
         """listening to mpv duration change event"""
@@ -484,8 +537,168 @@ class MpvPlayer(AbstractPlayer):
             logger.info('playlist provide no song anymore.')
 
     def _on_event(self, event):
-        if event['event_id'] == MpvEventID.END_FILE:
+        event_id = event['event_id']
+        if event_id == self._seek_event_id:
+            self._position_force_emit = True
+        elif event_id == self._end_file_event_id:
             reason = event['event']['reason']
             logger.debug('Current song finished. reason: %d' % reason)
-            if self.state != State.stopped and reason != MpvEventEndFile.ABORTED:
+            if self.state != State.stopped and \
+                    reason != self._end_file_aborted:
                 self.song_finished.emit()
+
+
+class NullPlayer(AbstractPlayer):
+    """player which does not output audio
+
+    It simulates playback timing: ``position_changed`` is emitted
+    periodically when playing, and ``song_finished`` is emitted when
+    position reaches the duration, just like the END_FILE event of mpv.
+    It is useful for benchmarking and server-only deployments, where
+    libmpv may not be available.
+
+    Media is never opened, so the duration is song model ``duration``,
+    or ``default_duration`` if song duration is unknown.
+    """
+
+    def __init__(self, tick_interval=0.1, default_duration=180, speed=1,
+                 *args, **kwargs):
+        """
+        :param tick_interval: interval (seconds) of position ticks
+        :param default_duration: default media duration (seconds)
+        :param speed: playback speed, use a large value for load testing
+        """
+        super(NullPlayer, self).__init__(**kwargs)
+        self._tick_interval = tick_interval
+        self._default_duration = default_duration
+        self._speed = speed
+
+        # position = _started_position + (now - _started_at) * speed
+        self._started_at = None  # None means clock is not running
+        self._started_position = 0
+        self._lock = threading.RLock()
+        self._stopped = threading.Event()
+        self._ticker = None
+
+        self._playlist = Playlist()
+        self._playlist.song_changed.connect(self._on_song_changed)
+
+    def initialize(self):
+        self._ticker = threading.Thread(target=self._run, daemon=True,
+                                        name='NullPlayerTicker')
+        self._ticker.start()
+        self.song_finished.connect(self.play_next)
+        logger.info('Player initialize finished.')
+
+    def shutdown(self):
+        self._stopped.set()
+
+    def _start_clock(self, position):
+        with self._lock:
+            self._started_position = position
+            self._started_at = time.monotonic()
+
+    def _stop_clock(self):
+        with self._lock:
+            self._started_position = self._current_position()
+            self._started_at = None
+
+    def _current_position(self):
+        if self._started_at is None:
+            return self._started_position
+        elapsed = time.monotonic() - self._started_at
+        return self._started_position + elapsed * self._speed
+
+    def _run(self):
+        while not self._stopped.wait(self._tick_interval):
+            self.tick()
+
+    def tick(self):
+        """update position, it is called by ticker thread periodically"""
+        with self._lock:
+            if self._started_at is None:
+                return
+            position = self._current_position()
+            finished = self.duration is not None and position >= self.duration
+            if finished:
+                position = self.duration
+                self._started_at = None
+                self._started_position = position
+        self._emit_position_changed(position)
+        if finished and self.state != State.stopped:
+            logger.debug('Current song finished.')
+            self.song_finished.emit()
+
+    def play(self, url):
+        logger.debug("Player will play: '%s'", url)
+        song = self.current_song
+        if song is not None and song.duration:
+            duration = song.duration / 1000  # milliseconds
+        else:
+            duration = self._default_duration
+        self._start_clock(0)
+        self._position_force_emit = True
+        self._emit_position_changed(0)
+        self.duration = duration
+        self.state = State.playing
+        self.media_changed.emit(url)
+
+    def play_song(self, song):
+        if self.playlist.current_song is not None and \
+                self.playlist.current_song == song:
+            logger.warning('the song to be played is same as current song')
+            return
+        self._playlist.current_song = song
+
+    def play_next(self):
+        self.playlist.current_song = self.playlist.next_song
+
+    def play_previous(self):
+        self.playlist.current_song = self.playlist.previous_song
+
+    def resume(self):
+        if self.state == State.paused:
+            self._start_clock(self._current_position())
+            self.state = State.playing
+
+    def pause(self):
+        if self.state == State.playing:
+            self._stop_clock()
+            self.state = State.paused
+
+    def toggle(self):
+        if self.state == State.playing:
+            self.pause()
+        else:
+            self.resume()
+
+    def stop(self):
+        logger.info('stop player...')
+        with self._lock:
+            self._started_at = None
+            self._started_position = 0
+        self.state = State.stopped
+
+    @property
+    def position(self):
+        return self._position
+
+    @position.setter
+    def position(self, position):
+        with self._lock:
+            self._started_position = position
+            if self._started_at is not None:
+                self._started_at = time.monotonic()
+        self._position = position
+        self._position_force_emit = True
+
+    def _on_song_changed(self, song):
+        logger.debug('player received song changed signal')
+        if song is not None:
+            logger.info('Will play song: %s' % self._playlist.current_song)
+            # media is never opened, so use fuo uri instead of song url,
+            # getting song url may send http requests
+            self.play(str(song))
+        else:
+            self.stop()
+            logger.info('playlist provide no song anymore.')
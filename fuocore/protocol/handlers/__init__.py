@@ -64,6 +64,9 @@ def exec_cmd(app, live_lyric, cmd):
     elif cmd.action in ('status',):
         handler = StatusHandler(app,
                                 live_lyric=live_lyric)
+    elif cmd.action in ('pubsub',):
+        handler = PubsubHandler(app,
+                                live_lyric=live_lyric)
     else:
         return 'Oops Command not found!\n'
 
@@ -134,6 +137,24 @@ class StatusHandler(AbstractHandler):
         return '\n'.join(msgs)
 
 
+class PubsubHandler(AbstractHandler):
+    def handle(self, cmd):
+        """show status of each pubsub subscriber
+
+        lag is the number of messages waiting to be sent to the subscriber.
+        """
+        gateway = self.app.pubsub_gateway
+        msgs = []
+        for subscriber in gateway.subscribers:
+            msgs.append('{}:{}\tlag:{}\tsent:{}\tdropped:{}'.format(
+                subscriber.addr[0],
+                subscriber.addr[1],
+                subscriber.lag,
+                subscriber.sent_count,
+                subscriber.dropped_count))
+        return '\n'.join(msgs)
+
+
 class PlayerHandler(AbstractHandler):
     def handle(self, cmd):
         if cmd.action == 'play':
@@ -221,6 +242,7 @@ Available commands::
     play fuo://xxx/songs/yyy  # play yyy song
     list  # show player current playlist
     status  # show player status
+    pubsub  # show pubsub subscribers status
     next  # play next song
     previous  # play previous song
     pause
@@ -230,6 +252,11 @@ Available commands::
 Watch live lyric::
 
     echo "sub topic.live_lyric" | nc host 23334
+
+Watch player events (player.state, player.position,
+player.volume, playlist.song_changed)::
+
+    printf "sub player.*\nsub playlist.song_changed\n" | nc host 23334
 """
 
 
@@ -10,7 +10,52 @@ fuocore.protocol.handlers.helper
 TODO: 让代码长得更好看
 """
 
+from functools import lru_cache
+import re
+
+
+# 东亚宽字符（East Asian Wide/Fullwidth）的码位区间表，显示宽度为 2
+#
+# 参考 Markus Kuhn 的 wcwidth 实现，只列出了常见的区间
+_WIDE_CHAR_RANGES = (
+    (0x1100, 0x115F),    # Hangul Jamo
+    (0x2E80, 0x303E),    # CJK Radicals .. CJK Symbols and Punctuation
+    (0x3041, 0x33FF),    # Hiragana .. CJK Compatibility
+    (0x3400, 0x4DBF),    # CJK Unified Ideographs Extension A
+    (0x4E00, 0x9FFF),    # CJK Unified Ideographs
+    (0xA000, 0xA4CF),    # Yi Syllables .. Yi Radicals
+    (0xAC00, 0xD7A3),    # Hangul Syllables
+    (0xF900, 0xFAFF),    # CJK Compatibility Ideographs
+    (0xFE30, 0xFE4F),    # CJK Compatibility Forms
+    (0xFF00, 0xFF60),    # Fullwidth Forms
+    (0xFFE0, 0xFFE6),    # Fullwidth Signs
+    (0x1F300, 0x1F64F),  # Miscellaneous Symbols and Pictographs .. Emoticons
+    (0x1F900, 0x1F9FF),  # Supplemental Symbols and Pictographs
+    (0x20000, 0x2FFFD),  # CJK Unified Ideographs Extension B ..
+    (0x30000, 0x3FFFD),
+)
+
+_WIDE_CHAR_RE = re.compile('[{}]'.format(''.join(
+    '{}-{}'.format(chr(start), chr(end)) for start, end in _WIDE_CHAR_RANGES)))
+_NON_ASCII_RE = re.compile(r'[^\x00-\x7f]')
+
+
+def _text_width(text):
+    """计算字符串的显示宽度，宽字符的宽度为 2
+
+    >>> _text_width('12345')
+    5
+    >>> _text_width('哈s')
+    3
+    >>> _text_width('ハロー')
+    6
+    """
+    if _NON_ASCII_RE.search(text) is None:
+        return len(text)
+    return len(text) + len(_WIDE_CHAR_RE.findall(text))
+
 
+@lru_cache(maxsize=4096)
 def _fit_text(text, length, filling=True):
     """裁剪或者填补字符串，控制其显示的长度
 
@@ -22,62 +67,92 @@ def _fit_text(text, length, filling=True):
     '哈s哈…'
     >>> _fit_text('sssss', 5)
     'sssss'
+    >>> _fit_text('ssssss', 5)  # doctest: -ELLIPSIS
+    'ssss…'
+
+    歌曲标题、歌手名等字符串会被反复展示，所以这里对结果进行了缓存。
 
     FIXME: 这样可能会截断一些英文词汇
     """
     assert 80 >= length >= 5
 
-    text_len = 0
-    len_index_map = {}
-    for i, c in enumerate(text):
-        # FIXME: 根据目前少量观察，在大部分字体下，
-        # \u4e00 后面的字符宽度是英文字符两倍
-        if ord(c) < 19968:  # ord(u'\u4e00')
-            text_len += 1
-            len_index_map[text_len] = i
-        else:
-            text_len += 2
-            len_index_map[text_len] = i
-
+    text_len = _text_width(text)
     if text_len <= length:
         if filling:
             return text + (length - text_len) * ' '
         return text
 
     remain = length - 1
-    if remain in len_index_map:
-        return text[:(len_index_map[remain] + 1)] + '…'
-    else:
-        return text[:(len_index_map[remain - 1] + 1)] + ' …'
+    if text_len == len(text):  # 没有宽字符
+        return text[:remain] + '…'
+
+    # 字符串宽度超过了 length，只需要遍历前 remain 个字符
+    width = 0
+    for i, c in enumerate(text):
+        c_width = 2 if _WIDE_CHAR_RE.match(c) else 1
+        if width + c_width > remain:
+            break
+        width += c_width
+    if width == remain:
+        return text[:i] + '…'
+    return text[:i] + ' …'
 
 
 def show_song(song, uri_length=None, brief=False):
     """以一行文字的方式显示一首歌的信息
 
+    简要信息中歌曲自身的部分会被缓存在 ``song._display_cache`` 中，
+    歌曲字段被重新赋值时缓存失效，这样反复执行 ``list``/``status``
+    等命令时几乎不需要重新计算。歌手名不会被缓存：歌手改名或者
+    ``song.artists.append(...)`` 都不会给歌曲字段赋值。
+
     :param uri_length: 控制 song uri 的长度
     :param brief: 是否只显示简要信息
     """
-    artists = song.artists or []
-    artists_name = ','.join([artist.name for artist in artists])
+    if not brief:
+        return _show_song(song, uri_length)
+
+    artists_name = _fit_text(_join_artists_name(song), 20, filling=False)
+    cache = getattr(song, '_display_cache', None)
+    if cache is not None and uri_length in cache:
+        return cache[uri_length] + artists_name
+    prefix = _show_song_brief_prefix(song, uri_length)
+    # 生成展示文本时可能会触发字段的加载，从而让缓存失效，所以重新获取一次
+    cache = getattr(song, '_display_cache', None)
+    if cache is None:
+        cache = {}
+        song._display_cache = cache
+    cache[uri_length] = prefix
+    return prefix + artists_name
+
+
+def _join_artists_name(song):
+    return ','.join([artist.name for artist in song.artists or []])
+
+
+def _show_song_uri(song, uri_length=None):
+    if uri_length is not None:
+        return _fit_text(str(song), uri_length)
+    return str(song)
+
+
+def _show_song_brief_prefix(song, uri_length=None):
+    """简要信息中除歌手名之外的部分"""
     title = _fit_text(song.title, 18, filling=False)
+    return '{song}\t# {title} - '.format(song=_show_song_uri(song, uri_length),
+                                         title=title)
+
+
+def _show_song(song, uri_length=None):
+    artists = song.artists or []
+    artists_name = _join_artists_name(song)
     if song.album is not None:
         album_name = song.album.name
         album_uri = str(song.album)
     else:
         album_name = 'Unknown'
         album_uri = ''
-    if uri_length is not None:
-        song_uri = _fit_text(str(song), uri_length)
-    else:
-        song_uri = str(song)
-    if brief:
-        artists_name = _fit_text(artists_name, 20, filling=False)
-        s = '{song}\t# {title} - {artists_name}'.format(
-            song=song_uri,
-            title=title,
-            artists_name=artists_name,
-            album_name=album_name)
-        return s
+    song_uri = _show_song_uri(song, uri_length)
     artists_uri = ','.join(str(artist) for artist in artists)
     msgs = (
         'provider     {}'.format(song.source),
@@ -1,21 +1,65 @@
-from collections import defaultdict
+"""
+fuocore.pubsub
+~~~~~~~~~~~~~~
+
+A simple pubsub server which runs on asyncio event loop.
+
+Each subscriber has a bounded outbound queue and a writer coroutine,
+so the publisher never blocks on sockets, and a slow subscriber does
+not affect others. All subscribers share one thread (the event loop).
+"""
+
+import asyncio
+from collections import defaultdict, deque
+from enum import Enum
+from fnmatch import fnmatchcase
 import logging
-from threading import Thread
+import socket
 
-from fuocore.thread_tcp_server import TcpServer
+from fuocore.aio_tcp_server import TcpServer
 
 
 logger = logging.getLogger(__name__)
 
+#: max size of an incomplete command, the connection is closed if the
+#: client sends a longer line
+_MAX_COMMAND_SIZE = 4096
+
 
 class DeadSubscriber(Exception):
     pass
 
 
+class OverflowPolicy(Enum):
+    """what to do when a subscriber's outbound queue is full"""
+    drop_oldest = 0  #: drop the oldest queued message
+    drop_newest = 1  #: drop the message being published
+    disconnect = 2  #: disconnect the subscriber
+
+
 class Subscriber(object):
-    def __init__(self, addr, conn):
+    """a subscriber connection with its own bounded outbound queue
+
+    :param maxsize: max number of queued messages
+    :param policy: :class:`OverflowPolicy`, default is drop_oldest,
+        since a late live lyric is useless anyway.
+    """
+
+    def __init__(self, addr, conn, maxsize=100,
+                 policy=OverflowPolicy.drop_oldest):
         self._addr = addr
         self._conn = conn
+        self._maxsize = maxsize
+        self._policy = policy
+
+        self._queue = deque()
+        self._ready = asyncio.Event()
+        self._dead = False
+
+        #: number of messages which are sent to subscriber
+        self.sent_count = 0
+        #: number of messages which are dropped because of overflow
+        self.dropped_count = 0
 
     def __eq__(self, obj):
         return self._addr == obj._addr
@@ -23,23 +67,100 @@ class Subscriber(object):
     def __hash__(self):
         return id(self._addr)
 
+    @property
+    def addr(self):
+        return self._addr
 
-def sendto_subscriber(subscriber, msg):
-    try:
-        subscriber._conn.send(bytes(msg, 'utf-8'))
-    except BrokenPipeError:
-        subscriber._conn.close()
-        del subscriber
-        raise DeadSubscriber
+    @property
+    def lag(self):
+        """number of messages waiting to be sent"""
+        return len(self._queue)
+
+    def send(self, msg):
+        """put msg into outbound queue, this should be called in event loop
+
+        :param msg: encoded message (bytes), it is shared by all subscribers
+        """
+        if self._dead:
+            return
+        if len(self._queue) >= self._maxsize:
+            self.dropped_count += 1
+            if self._policy == OverflowPolicy.drop_newest:
+                return
+            elif self._policy == OverflowPolicy.disconnect:
+                logger.debug('Subscriber %s:%d is too slow, disconnect it.'
+                             % self._addr)
+                self._dead = True
+                self._ready.set()
+                return
+            self._queue.popleft()
+        self._queue.append(msg)
+        self._ready.set()
+
+    async def run(self):
+        """send queued messages until subscriber is dead"""
+        event_loop = asyncio.get_event_loop()
+        while True:
+            await self._ready.wait()
+            self._ready.clear()
+            while self._queue and not self._dead:
+                # send all queued messages in one syscall
+                count = len(self._queue)
+                if count == 1:
+                    data = self._queue.popleft()
+                else:
+                    data = b''.join(self._queue)
+                    self._queue.clear()
+                try:
+                    await event_loop.sock_sendall(self._conn, data)
+                except (BrokenPipeError, ConnectionError):
+                    self._dead = True
+                else:
+                    self.sent_count += count
+            if self._dead:
+                self._queue.clear()
+                # wake up the reader, it closes the connection,
+                # see :func:`handle`
+                try:
+                    self._conn.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+                raise DeadSubscriber
 
 
 class Gateway(object):
-    def __init__(self):
+    """
+    :param subscriber_maxsize: outbound queue size of each subscriber
+    :param overflow_policy: :class:`OverflowPolicy` for subscribers
+    """
+
+    def __init__(self, loop=None, subscriber_maxsize=100,
+                 overflow_policy=OverflowPolicy.drop_oldest):
         self.topics = set()
+        self.subscriber_maxsize = subscriber_maxsize
+        self.overflow_policy = overflow_policy
         self._relations = defaultdict(set)  # {'topic': subscriber_set}
+        self._wildcards = defaultdict(set)  # {subscriber: pattern_set}
+        self._loop = loop or asyncio.get_event_loop()
+
+    @property
+    def subscribers(self):
+        """all alive subscribers"""
+        subscribers = set()
+        for topic_subscribers in self._relations.values():
+            subscribers |= topic_subscribers
+        return subscribers
+
+    def create_subscriber(self, addr, conn):
+        return Subscriber(addr, conn,
+                          maxsize=self.subscriber_maxsize,
+                          policy=self.overflow_policy)
 
     def add_topic(self, topic):
         self.topics.add(topic)
+        for subscriber, patterns in self._wildcards.items():
+            if any(fnmatchcase(topic, pattern) for pattern in patterns):
+                self.link(topic, subscriber)
 
     def remove_topic(self, topic):
         if topic in self.topics:
@@ -52,69 +173,183 @@ class Gateway(object):
         if topic in self.topics and subscriber in self._relations[topic]:
             self._relations[topic].remove(subscriber)
 
+    def subscribe(self, pattern, subscriber):
+        """link subscriber to topics which match pattern
+
+        pattern can be a topic name, or a shell-style wildcard such as
+        ``player.*``, topics added later are linked if they match.
+
+        :return: False if pattern is not a wildcard and topic does not exist
+        """
+        if any(c in pattern for c in '*?['):
+            self._wildcards[subscriber].add(pattern)
+            topics = [topic for topic in self.topics
+                      if fnmatchcase(topic, pattern)]
+        elif pattern in self.topics:
+            topics = [pattern]
+        else:
+            return False
+        for topic in topics:
+            self.link(topic, subscriber)
+        return True
+
+    def unsubscribe(self, pattern, subscriber):
+        """unlink subscriber from topics which match pattern"""
+        patterns = self._wildcards.get(subscriber)
+        if patterns is not None:
+            patterns.discard(pattern)
+            if not patterns:
+                self._wildcards.pop(subscriber)
+        for topic in self.topics:
+            if fnmatchcase(topic, pattern):
+                self.unlink(topic, subscriber)
+
+    def has_subscriptions(self, subscriber):
+        """whether subscriber subscribes any topic or wildcard"""
+        if self._wildcards.get(subscriber):
+            return True
+        return any(subscriber in subscribers
+                   for subscribers in self._relations.values())
+
     def remove_subscriber(self, subscriber):
         for topic in self.topics:
             if subscriber in self._relations[topic]:
                 self._relations[topic].remove(subscriber)
+        self._wildcards.pop(subscriber, None)
 
     def publish(self, msg, topic):
-        # NOTE: use queue? maybe.
-        subscribers = self._relations[topic]
+        """publish msg to all subscribers of topic
+
+        It is safe to call this method in any thread, msg is dispatched
+        to subscribers' queues in the event loop thread.
+        """
+        self._loop.call_soon_threadsafe(self._publish, msg, topic)
+
+    def _publish(self, msg, topic):
+        subscribers = self._relations.get(topic)
+        if not subscribers:
+            return
+        # encode once, all subscribers share the same buffer
+        data = bytes(msg, 'utf-8')
         for subscriber in subscribers:
-            try:
-                sendto_subscriber(subscriber, msg)
-            except DeadSubscriber:
-                # NOTE: need lock?
-                self._relations[topic].remove(subscriber)
-                break
+            subscriber.send(data)
 
 
-def handle(conn, addr, gateway, *args, **kwargs):
+async def _handle_command(conn, line, gateway, subscriber):
+    """handle one command line, reply ACK or error message
+
+    :return: True if subscriber subscribes topics successfully
     """
+    event_loop = asyncio.get_event_loop()
+    parts = line.split()
+    if len(parts) != 2:
+        await event_loop.sock_sendall(conn, b"Invalid command\n")
+        return False
+    cmd, topic = parts
+    cmd = cmd.lower()
+    if cmd == 'sub':
+        if not gateway.subscribe(topic, subscriber):
+            msg = "Unknown topic '{}'\n".format(topic)
+            await event_loop.sock_sendall(conn, bytes(msg, 'utf-8'))
+            return False
+    elif cmd == 'unsub':
+        gateway.unsubscribe(topic, subscriber)
+    else:
+        msg = "Unknown command '{}'\n".format(cmd)
+        await event_loop.sock_sendall(conn, bytes(msg, 'utf-8'))
+        return False
+    msg = 'ACK {} {}\n'.format(cmd, topic)
+    await event_loop.sock_sendall(conn, bytes(msg, 'utf-8'))
+    return cmd == 'sub'
+
+
+async def handle(conn, addr, gateway, *args, **kwargs):
+    """handle pubsub client commands
+
+    Client can ``sub``/``unsub`` many topics in one connection, topic can
+    be a wildcard such as ``player.*``. Each command ends with ``\\n``.
+
+    If client shutdowns writing after subscribing topics, such as
+    ``echo "sub xxx" | nc host port``, messages are still sent to it
+    until the connection is closed.
+
     NOTE: use tcp instead of udp because some operations need ack
     """
-    conn.sendall(b'OK pubsub 1.0\n')
-    while True:
-        try:
-            s = conn.recv(1024).decode('utf-8').strip()
-            if not s:
-                conn.close()
+    event_loop = asyncio.get_event_loop()
+    subscriber = gateway.create_subscriber(addr, conn)
+    writer = None
+    try:
+        await event_loop.sock_sendall(conn, b'OK pubsub 1.0\n')
+        buf = b''
+        while True:
+            try:
+                data = await event_loop.sock_recv(conn, 1024)
+            except OSError:
+                logger.debug('Client close the connection.')
+                return
+            eof = not data
+            # a command may be split into many chunks, only complete
+            # lines are handled, the last line is handled when eof
+            lines = (buf + data).split(b'\n')
+            buf = b'' if eof else lines.pop()
+            if len(buf) > _MAX_COMMAND_SIZE:
+                await event_loop.sock_sendall(conn, b"Invalid command\n")
+                return
+            for line in lines:
+                # invalid bytes are replaced, so they are invalid commands
+                line = line.decode('utf-8', errors='replace').strip()
+                if not line:
+                    continue
+                subscribed = await _handle_command(
+                    conn, line, gateway, subscriber)
+                if subscribed and writer is None:
+                    writer = event_loop.create_task(subscriber.run())
+            if eof:
                 break
-        except ConnectionResetError:
-            logger.debug('Client close the connection.')
-            break
-
-        parts = s.split(' ')
-        if len(parts) != 2:
-            conn.send(b"Invalid command\n")
-            continue
-        cmd, topic = parts
-        if cmd.lower() != 'sub':
-            conn.send(bytes("Unknown command '{}'\n".format(cmd.lower()), 'utf-8'))
-            continue
-        if topic not in gateway.topics:
-            conn.send(bytes("Unknown topic '{}'\n".format(topic), 'utf-8'))
-            continue
-        conn.sendall(bytes('ACK {} {}\n'.format(cmd, topic), 'utf-8'))
-        subscriber = Subscriber(addr, conn)
-        gateway.link(topic, subscriber)
-        break
+
+        # client closes the connection, or it just shutdowns writing,
+        # writer finishes when it fails to send messages to client
+        if writer is not None and gateway.has_subscriptions(subscriber):
+            await writer
+    except OSError:  # such as BrokenPipeError when sending ack
+        logger.debug('Send to client %s:%d failed.' % addr)
+    except DeadSubscriber:
+        logger.debug('Subscriber %s:%d is dead.' % addr)
+    finally:
+        gateway.remove_subscriber(subscriber)
+        if writer is not None:
+            writer.cancel()
+            try:
+                await writer
+            except DeadSubscriber:
+                logger.debug('Subscriber %s:%d is dead.' % addr)
+            except asyncio.CancelledError:
+                pass
+        conn.close()
 
 
 def run(host='0.0.0.0', port=23334):
-    gateway = Gateway()
+    """run pubsub server in current event loop
+
+    The server starts serving when the event loop runs.
+    """
+    event_loop = asyncio.get_event_loop()
+    gateway = Gateway(loop=event_loop)
     server = TcpServer(handle_func=handle, host=host, port=port)
-    Thread(target=server.run, args=(gateway,)).start()
+    event_loop.create_task(server.run(gateway))
     logger.info('Fuo pubsub server running  at {host}:{port}'.format(
         host=host, port=port))
     return gateway, server
 
 
 if __name__ == '__main__':
-    import time
+    async def publish_forever(gateway):
+        while True:
+            await asyncio.sleep(1)
+            gateway.publish('miao\n', 'topic.live_lyric')
+
     gateway, server = run()
     print('pubsub is running.')
     gateway.add_topic('topic.live_lyric')
-    while True:
-        time.sleep(1)
-        gateway.publish('miao\n', 'topic.live_lyric')
+    event_loop = asyncio.get_event_loop()
+    event_loop.run_until_complete(publish_forever(gateway))
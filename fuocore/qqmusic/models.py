@@ -16,22 +16,13 @@ class QQBaseModel(BaseModel):
     _provider = provider
     api = provider.api
 
+    # NOTE: fields in _detail_fields are fetched lazily, see DetailField
     _detail_fields = ()
 
     @classmethod
     def get(cls, identifier):
         raise NotImplementedError
 
-    def __getattribute__(self, name):
-        cls = type(self)
-        value = object.__getattribute__(self, name)
-        if name in cls._detail_fields and not value:
-            obj = cls.get(self.identifier)
-            for field in cls._detail_fields:
-                setattr(self, field, getattr(obj, field))
-            value = object.__getattribute__(self, name)
-        return value
-
 
 class QQSongModel(SongModel, QQBaseModel):
 
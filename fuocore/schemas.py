@@ -1,6 +1,16 @@
 # -*- coding: utf-8 -*-
 
-from marshmallow import Schema, fields, post_load
+from collections.abc import Mapping
+
+from marshmallow import (
+    Schema,
+    ValidationError,
+    class_registry,
+    fields,
+    post_load,
+)
+from marshmallow.decorators import POST_LOAD
+from marshmallow.utils import is_collection, missing as marshmallow_missing
 
 from fuocore.models import (
     AlbumModel,
@@ -80,3 +90,171 @@ class UserSchema(BaseSchema):
     @post_load
     def create_model(self, data):
         return UserModel(**data)
+
+
+# 编译版的 loader
+# ---------------
+#
+# marshmallow 的 ``Schema.load`` 比较通用，每个字段都要经过好几层函数调用，
+# 嵌套 Schema 时还会创建新的 Schema 对象。反序列化一个上千首歌的歌单时，
+# 这部分开销很明显。这里根据 Schema 的字段声明生成一个专门的 loader，
+# 行为和 ``Schema(strict=True).load(data)[0]`` 保持一致，Schema 本身仍然是
+# 字段定义的唯一来源。
+
+
+_NO_VALUE = object()
+
+
+def _fail(name, field, key, **kwargs):
+    msg = field.error_messages[key].format(**kwargs)
+    raise ValidationError({name: [msg]})
+
+
+def _compile_field(field):
+    """生成一个函数，把原始值转换为字段对应的 python 值"""
+    if isinstance(field, fields.Nested):
+        nested = field.nested
+        # Schema 之间可能互相嵌套，所以在第一次使用的时候才编译
+        loader = None
+
+        def load_nested(value):
+            nonlocal loader
+            if loader is None:
+                schema_cls = nested
+                if isinstance(schema_cls, str):
+                    schema_cls = class_registry.get_class(schema_cls)
+                loader = compile_loader(schema_cls)
+            return loader(value)
+
+        if field.many:
+            def convert(value):
+                if not is_collection(value):
+                    field.fail('type', input=value,
+                               type=value.__class__.__name__)
+                return [load_nested(each) for each in value]
+            return convert
+        return load_nested
+
+    if isinstance(field, fields.List):
+        convert_item = _compile_field(field.container)
+
+        def convert(value):
+            if not is_collection(value):
+                field.fail('invalid')
+            return [convert_item(each) for each in value]
+        return convert
+
+    if isinstance(field, fields.String):
+        def convert(value):
+            if not isinstance(value, str):
+                field.fail('invalid')
+            return value
+        return convert
+
+    if isinstance(field, fields.Number) and \
+            type(field) in (fields.Integer, fields.Float):
+        num_type = field.num_type
+
+        def convert(value):
+            try:
+                return num_type(value)
+            except (TypeError, ValueError):
+                field.fail('invalid')
+            except OverflowError:
+                field.fail('too_large')
+        return convert
+
+    if type(field) is fields.Field:
+        return None
+
+    # 其它类型的字段不常用，直接使用 marshmallow 的实现
+    return field.deserialize
+
+
+def _compile_field_loader(name, field):
+    key = field.attribute or name
+    load_from = field.load_from
+    missing = field.missing
+    required = field.required
+    allow_none = field.allow_none
+    convert = _compile_field(field)
+    validators = tuple(field.validators)
+
+    def load_field(data, result):
+        value = data.get(name, _NO_VALUE)
+        if value is _NO_VALUE and load_from:
+            value = data.get(load_from, _NO_VALUE)
+        if value is _NO_VALUE:
+            value = missing() if callable(missing) else missing
+            if value is marshmallow_missing:
+                if required:
+                    _fail(name, field, 'required')
+                return
+        if value is None:
+            if not allow_none:
+                _fail(name, field, 'null')
+            result[key] = None
+            return
+        if convert is not None or validators:
+            try:
+                if convert is not None:
+                    value = convert(value)
+                for validator in validators:
+                    if validator(value) is False:
+                        field.fail('validator_failed')
+            except ValidationError as e:
+                raise ValidationError({name: e.messages})
+        result[key] = value
+
+    return load_field
+
+
+def compile_loader(schema_cls):
+    """为 Schema 类生成 loader，同一个 Schema 类的 loader 只生成一次
+
+    loader 在调用 ``compile_loader`` 时就会生成（比如 netease/schemas.py
+    在导入时生成），只有 Nested 字段对应的 schema 会延迟到第一次
+    加载数据时才编译，因为 Schema 之间可能互相嵌套。
+
+    loader 接受一个 dict，返回 post_load 处理之后的结果，
+    数据不合法时抛出 :class:`marshmallow.ValidationError` ::
+
+        load_song = compile_loader(NeteaseSongSchema)
+        song = load_song(data)  # NeteaseSongSchema(strict=True).load(data)[0]
+
+    loader 支持 ``required``, ``load_from``, ``missing``, ``allow_none``
+    这些字段参数以及 post_load 钩子。如果 Schema 使用了其它钩子，
+    （比如 pre_load 和 validates_schema），则退回到 marshmallow 的实现。
+    """
+    loader = _loaders.get(schema_cls)
+    if loader is not None:
+        return loader
+
+    schema = schema_cls(strict=True)
+    processors = schema_cls.__processors__
+    if any(processors[tag] for tag in processors
+           if tag != (POST_LOAD, False)):
+        def loader(data):
+            return schema.load(data)[0]
+    else:
+        field_loaders = [_compile_field_loader(name, field)
+                         for name, field in schema.fields.items()
+                         if not field.dump_only]
+        hooks = [getattr(schema, attr)
+                 for attr in processors[(POST_LOAD, False)]]
+
+        def loader(data):
+            if not isinstance(data, Mapping):
+                raise ValidationError({'_schema': ['Invalid input type.']})
+            result = {}
+            for load_field in field_loaders:
+                load_field(data, result)
+            for hook in hooks:
+                result = hook(result)
+            return result
+
+    _loaders[schema_cls] = loader
+    return loader
+
+
+_loaders = {}
@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 
+from bisect import bisect_right
 from functools import wraps
+import hashlib
 import logging
 import time
 
@@ -40,6 +42,18 @@ def elfhash(s):
     return (hash & 0x7FFFFFFF)
 
 
+def digest(s, length=16):
+    """stable and collision-resistant hash of a string
+
+    It is much faster than :func:`elfhash` which iterates bytes in python,
+    and a 64 bits hash (16 hex digits) rarely collides in a music library.
+
+    >>> digest('hello world')
+    '2aae6c35c94fcfb4'
+    """
+    return hashlib.sha1(s.encode('utf-8')).hexdigest()[:length]
+
+
 def find_previous(element, l):
     """
     find previous element in a sorted list
@@ -54,16 +68,7 @@ def find_previous(element, l):
     >>> find_previous(3, [1, 2])
     2
     """
-    length = len(l)
-    for index, current in enumerate(l):
-        # current is the last element
-        if length - 1 == index:
-            return current
-
-        # current is the first element
-        if index == 0:
-            if element < current:
-                return None
-
-        if current <= element < l[index+1]:
-            return current
+    index = bisect_right(l, element)
+    if index == 0:
+        return None
+    return l[index - 1]
@@ -162,17 +162,31 @@ class MpvEventProperty(Structure):
                 ('format', MpvFormat),
                 ('data', c_void_p)]
     def as_dict(self):
-        if self.format.value == MpvFormat.STRING:
+        fmt = self.format.value
+        if fmt == MpvFormat.STRING:
             proptype, _access = ALL_PROPERTIES.get(self.name, (str, None))
             return {'name': self.name.decode('utf-8'),
                     'format': self.format,
                     'data': self.data,
                     'value': proptype(cast(self.data, POINTER(c_char_p)).contents.value.decode('utf-8'))}
+        elif fmt in _NATIVE_FORMAT_CTYPES:
+            # Read native values directly from the data pointer, no string parsing involved
+            ctype, pytype = _NATIVE_FORMAT_CTYPES[fmt]
+            return {'name': self.name.decode('utf-8'),
+                    'format': self.format,
+                    'data': self.data,
+                    'value': pytype(cast(self.data, POINTER(ctype)).contents.value)}
         else:
             return {'name': self.name.decode('utf-8'),
                     'format': self.format,
                     'data': self.data}
 
+_NATIVE_FORMAT_CTYPES = {
+        MpvFormat.FLAG:     (c_int,     bool),
+        MpvFormat.INT64:    (c_int64,   int),
+        MpvFormat.DOUBLE:   (c_double,  float),
+    }
+
 class MpvEventLogMessage(Structure):
     _fields_ = [('prefix', c_char_p),
                 ('level', c_char_p),
@@ -337,8 +351,11 @@ def _event_loop(event_handle, playback_cond, event_callbacks, property_handlers,
                 if handlerid in property_handlers:
                     name = pc['name']
                     if 'value' in pc:
-                        proptype, _access = ALL_PROPERTIES[name]
-                        property_handlers[handlerid](name, proptype(_ensure_encoding(pc['value'])))
+                        value = pc['value']
+                        if pc['format'].value == MpvFormat.STRING:
+                            proptype, _access = ALL_PROPERTIES[name]
+                            value = proptype(_ensure_encoding(value))
+                        property_handlers[handlerid](name, value)
                     else:
                         property_handlers[handlerid](name, pc['data'], pc['format'])
             if eid == MpvEventID.LOG_MESSAGE and log_handler is not None:
@@ -506,10 +523,15 @@ class MPV(object):
     def script_message_to(self, target, *args):
         self.command('script_message_to', target, *args)
 
-    def observe_property(self, name, handler):
+    def observe_property(self, name, handler, fmt=MpvFormat.STRING):
+        """ Observe property ``name``, ``handler`` is called with (name, value) when it changes.
+
+        With ``fmt`` being MpvFormat.FLAG, MpvFormat.INT64 or MpvFormat.DOUBLE, the value is decoded from mpv's
+        native representation into bool, int or float respectively, which avoids string round-trips on frequently
+        changing properties such as time-pos. """
         hashval = c_ulonglong(hash(handler))
         self._property_handlers[hashval.value] = handler
-        _mpv_observe_property(self._event_handle, hashval, name.encode('utf-8'), MpvFormat.STRING)
+        _mpv_observe_property(self._event_handle, hashval, name.encode('utf-8'), fmt)
 
     def unobserve_property(self, handler):
         handlerid = hash(handler)
@@ -0,0 +1,103 @@
+import os
+from unittest import TestCase
+
+from fuocore.library import Library
+from fuocore.models import SongModel
+
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), '../data/fixtures')
+
+
+class TestLibrary(TestCase):
+    def test_register_lazy(self):
+        library = Library()
+        library.register_lazy('local', 'fuocore.local.provider:provider')
+
+        provider = library.get('local')
+        self.assertEqual(provider.identifier, 'local')
+        self.assertIn(provider, library.list())
+        self.assertIsNone(library.get('xxx'))
+
+    def test_register_lazy_failed(self):
+        library = Library()
+        library.register_lazy('xxx', 'fuocore.not_exist:provider')
+        self.assertIsNone(library.get('xxx'))
+        self.assertEqual(library.list(), [])
+
+
+class TestLocalProvider(TestCase):
+    def test_load(self):
+        from fuocore.local.provider import LocalProvider
+
+        provider = LocalProvider(library_paths=[FIXTURES_DIR])
+        self.assertEqual(provider.songs, [])
+        provider.load()
+        self.assertTrue(provider.songs)
+        song = provider.songs[0]
+        self.assertIs(provider._identifier_song_map[song.identifier], song)
+
+    def test_get_song_by_legacy_identifier(self):
+        from fuocore.local.provider import LocalProvider
+        from fuocore.local.schemas import gen_legacy_identifier
+
+        provider = LocalProvider(library_paths=[FIXTURES_DIR])
+        provider.load()
+        song = provider.songs[0]
+        self.assertEqual(len(song.identifier), 16)
+        self.assertIs(provider._get_song(song.identifier), song)
+        legacy_identifier = gen_legacy_identifier(song.url)
+        self.assertIs(provider._get_song(legacy_identifier), song)
+        self.assertIsNone(provider._get_song('123'))
+
+    def test_identifier_collision(self):
+        from fuocore.local.provider import LocalProvider
+
+        provider = LocalProvider()
+        provider._songs = [
+            SongModel(source='local', identifier='1', url='/a.mp3'),
+            SongModel(source='local', identifier='1', url='/b.mp3'),
+        ]
+        provider.setup_library()
+        s1, s2 = provider._songs
+        self.assertNotEqual(s1.identifier, s2.identifier)
+        self.assertIs(provider._get_song(s1.identifier), s1)
+        self.assertIs(provider._get_song(s2.identifier), s2)
+
+    def test_album_and_artist_index(self):
+        from fuocore.local.provider import (
+            LAlbumModel,
+            LArtistModel,
+            LocalProvider,
+            LSongModel,
+        )
+
+        def create_song(identifier, album_name, artist_names, disc, track):
+            album = LAlbumModel(source='local', identifier=album_name,
+                                name=album_name)
+            artists = [LArtistModel(source='local', identifier=name,
+                                    name=name)
+                       for name in artist_names]
+            return LSongModel(source='local', identifier=identifier,
+                              title=identifier, url=identifier, album=album,
+                              artists=artists, disc=disc, track=track)
+
+        provider = LocalProvider()
+        provider._songs = [
+            create_song('s1', 'A', ['x'], 1, 2),
+            create_song('s2', 'B', ['x', 'y'], 1, 1),
+            create_song('s3', 'A', ['y'], 1, 1),
+            create_song('s4', 'A', ['x'], 0, 3),
+        ]
+        provider.setup_library()
+        s1, s2, s3, s4 = provider._songs
+
+        album = provider._identifier_album_map['A']
+        self.assertEqual(album.songs, [s4, s3, s1])
+        self.assertEqual([artist.name for artist in album.artists],
+                         ['x', 'y'])
+        self.assertIs(s1.album, s3.album)
+
+        artist = provider._identifier_artist_map['x']
+        self.assertEqual(artist.songs, [s4, s1, s2])
+        self.assertEqual([album.name for album in artist.albums], ['A', 'B'])
+        self.assertIs(s2.artists[0], artist)
@@ -1,6 +1,11 @@
+import asyncio
+import tempfile
+import time
 from unittest import TestCase
 
 from fuocore import LiveLyric
+from fuocore.lyric import LyricCache
+from fuocore.models import LyricModel, SongModel
 
 
 lyric = """[by:魏积分]
@@ -59,3 +64,130 @@ class TestLiveLyric(TestCase):
         live_lyric.on_position_changed(60)
         self.assertEqual(live_lyric.current_sentence,
                          '互いのすべてを　知りつくすまでが')
+
+    def test_seek(self):
+        song = FakeSong()
+        live_lyric = LiveLyric()
+        live_lyric.on_song_changed(song)
+        live_lyric.on_position_changed(0)
+        self.assertEqual(live_lyric.current_sentence, '')
+
+        for position in range(0, 70):
+            live_lyric.on_position_changed(position)
+        self.assertEqual(live_lyric.current_sentence,
+                         '愛ならば　いっそ　永久（とわ）に眠ろうか')
+
+        live_lyric.on_position_changed(272)
+        self.assertEqual(live_lyric.current_sentence, 'このTragedy Night')
+        live_lyric.on_position_changed(40)
+        self.assertEqual(live_lyric.current_sentence,
+                         '大都会に　僕はもう一人で')
+
+    def test_timeline_cache(self):
+        song = SongModel(source='fake', identifier=1,
+                         lyric=LyricModel(source='fake', identifier=1,
+                                          content=lyric))
+        live_lyric = LiveLyric(cache_size=1)
+        live_lyric.on_song_changed(song)
+        timeline = live_lyric._timeline
+        live_lyric.on_song_changed(song)
+        self.assertIs(live_lyric._timeline, timeline)
+
+        song.lyric = LyricModel(source='fake', identifier=1,
+                                content='[00:01.00][00:03.00]hello')
+        live_lyric.on_song_changed(song)
+        self.assertIsNot(live_lyric._timeline, timeline)
+        live_lyric.on_position_changed(3)
+        self.assertEqual(live_lyric.current_sentence, 'hello')
+
+    def test_translation(self):
+        song = SongModel(source='fake', identifier=1,
+                         lyric=LyricModel(
+                             source='fake', identifier=1,
+                             content='[00:01.00]hello\n[00:02.00]world',
+                             trans_content='[by:xxx]\n[00:01.00]你好'))
+        self.lines = []
+        live_lyric = LiveLyric()
+        live_lyric.line_changed.connect(self.on_line_changed)
+        live_lyric.on_song_changed(song)
+        live_lyric.on_position_changed(1)
+        live_lyric.on_position_changed(2)
+        self.assertEqual(live_lyric.current_sentence, 'world')
+        self.assertEqual(self.lines,
+                         [('', ''), ('hello', '你好'), ('world', '')])
+
+    def on_line_changed(self, sentence, translation):
+        self.lines.append((sentence, translation))
+
+
+class SlowSong(SongModel):
+    """song whose lyric is fetched slowly, like NSongModel"""
+
+    fetch_count = 0
+
+    @property
+    def lyric(self):
+        time.sleep(0.05)
+        SlowSong.fetch_count += 1
+        return LyricModel(source='fake', identifier=1, content=lyric)
+
+    @lyric.setter
+    def lyric(self, value):
+        pass
+
+
+class TestAsyncLiveLyric(TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.live_lyric = LiveLyric(loop=self.loop,
+                                    lyric_cache=LyricCache(self.tmpdir.name))
+        SlowSong.fetch_count = 0
+
+    def tearDown(self):
+        self.loop.close()
+        self.tmpdir.cleanup()
+
+    def test_load_in_background(self):
+        song = SlowSong(source='fake', identifier=1)
+        t = time.time()
+        self.live_lyric.on_song_changed(song)
+        self.assertLess(time.time() - t, 0.05)
+        self.live_lyric.on_position_changed(60)
+        self.assertEqual(self.live_lyric.current_sentence, '')
+
+        self.loop.run_until_complete(asyncio.sleep(0.2))
+        self.assertEqual(self.live_lyric.current_sentence,
+                         '互いのすべてを　知りつくすまでが')
+
+        # lyric is cached on disk
+        live_lyric = LiveLyric(lyric_cache=LyricCache(self.tmpdir.name))
+        live_lyric.on_song_changed(song)
+        live_lyric.on_position_changed(60)
+        self.assertEqual(live_lyric.current_sentence,
+                         '互いのすべてを　知りつくすまでが')
+        self.assertEqual(SlowSong.fetch_count, 1)
+
+    def test_song_changed_while_loading(self):
+        self.live_lyric.on_song_changed(SlowSong(source='fake', identifier=1))
+        self.live_lyric.on_song_changed(None)
+        self.loop.run_until_complete(asyncio.sleep(0.2))
+        self.live_lyric.on_position_changed(60)
+        self.assertEqual(self.live_lyric.current_sentence, '')
+
+    def test_empty_lyric_not_cached(self):
+        class ErrorSong(SongModel):
+            @property
+            def lyric(self):
+                # provider returns an error, such as {'code': -460}
+                return LyricModel(source='fake', identifier=1, content='')
+
+            @lyric.setter
+            def lyric(self, value):
+                pass
+
+        lyric_cache = LyricCache(self.tmpdir.name)
+        live_lyric = LiveLyric(lyric_cache=lyric_cache)
+        live_lyric.on_song_changed(ErrorSong(source='fake', identifier=1))
+        self.assertIsNone(lyric_cache.get(SlowSong(source='fake',
+                                                   identifier=1)))
@@ -0,0 +1,76 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from fuocore.local.provider import LocalProvider
+from fuocore.local.tags import read_any, read_metadata
+
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), '../data/fixtures')
+
+
+class TestReadMetadata(TestCase):
+    def test_formats(self):
+        for ext, title, track, duration in (
+                ('flac', 'FLAC Sample', '1/3', 201000),
+                ('ogg', 'Ogg Sample', '2/3', 202000),
+                ('m4a', 'M4A Sample', '3/3', 203000)):
+            fpath = os.path.join(FIXTURES_DIR, 'sample.' + ext)
+            metadata = read_metadata(fpath)
+            self.assertEqual(metadata['title'], [title])
+            self.assertEqual(metadata['artist'], ['fuocore'])
+            self.assertEqual(metadata['album'], ['Samples'])
+            self.assertEqual(metadata['tracknumber'], [track])
+            self.assertAlmostEqual(metadata['duration'], duration)
+            self.assertEqual(metadata['title'], read_any(fpath)['title'])
+
+    def test_id3(self):
+        metadata = read_metadata(os.path.join(FIXTURES_DIR, 'ybwm-ts.mp3'))
+        self.assertEqual(metadata['title'], ['You Belong With Me'])
+        self.assertEqual(metadata['artist'], ['Taylor Swift'])
+
+
+class TestFastMode(TestCase):
+    def setUp(self):
+        self.fpath = os.path.join(FIXTURES_DIR, 'ybwm-ts.mp3')
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _copy_without_info_header(self):
+        with open(self.fpath, 'rb') as f:
+            data = f.read()
+        fpath = os.path.join(self.tmpdir.name, 'cbr.mp3')
+        with open(fpath, 'wb') as f:
+            f.write(data.replace(b'Info', b'\x00' * 4, 1))
+        return fpath
+
+    def test_info_header(self):
+        metadata = read_metadata(self.fpath, fast=True)
+        exact = read_metadata(self.fpath)
+        self.assertEqual(metadata['title'], exact['title'])
+        self.assertEqual(metadata['artist'], exact['artist'])
+        self.assertFalse(metadata['duration_estimated'])
+        # encoder delay is not excluded
+        self.assertAlmostEqual(metadata['duration'], exact['duration'],
+                               delta=100)
+
+    def test_estimate_cbr_duration(self):
+        fpath = self._copy_without_info_header()
+        metadata = read_metadata(fpath, fast=True)
+        self.assertTrue(metadata['duration_estimated'])
+        self.assertAlmostEqual(metadata['duration'],
+                               read_metadata(self.fpath)['duration'],
+                               delta=500)
+
+    def test_provider_update_durations(self):
+        self._copy_without_info_header()
+        provider = LocalProvider(library_paths=[self.tmpdir.name])
+        provider.load(fast=True)
+        song = provider.songs[0]
+        self.assertTrue(song.duration_estimated)
+        provider.update_durations()
+        self.assertFalse(song.duration_estimated)
+        self.assertAlmostEqual(song.duration,
+                               read_metadata(song.url)['duration'])
@@ -44,3 +44,145 @@ class TestModel(TestCase):
         song = LastSongModel()
         self.assertEqual(song._meta.model_type, 1)
         self.assertEqual(song._meta.provider.name, 'fake')
+
+
+class TestModelDisplayCache(TestCase):
+
+    def test_cache_invalidated_when_field_changed(self):
+        from fuocore.models import SongModel
+        from fuocore.protocol.handlers.helpers import show_song
+
+        song = SongModel(source='fake', identifier=1, title='hello')
+        self.assertIn('hello', show_song(song, brief=True))
+        self.assertIsNotNone(song._display_cache)
+
+        song.title = 'world'
+        self.assertIsNone(song._display_cache)
+        self.assertIn('world', show_song(song, brief=True))
+
+    def test_artist_name_not_cached(self):
+        from fuocore.models import ArtistModel, SongModel
+        from fuocore.protocol.handlers.helpers import show_song
+
+        artist = ArtistModel(source='fake', identifier=1, name='hello')
+        song = SongModel(source='fake', identifier=1, title='song',
+                         artists=[artist])
+        self.assertIn('hello', show_song(song, brief=True))
+
+        artist.name = 'world'
+        song.artists.append(ArtistModel(source='fake', identifier=2,
+                                        name='foo'))
+        self.assertIn('world,foo', show_song(song, brief=True))
+        self.assertIsNotNone(song._display_cache)
+
+
+class TestModelSlots(TestCase):
+
+    def test_no_instance_dict(self):
+        from fuocore.models import SongModel
+
+        song = SongModel(source='fake', identifier=1, title='hello')
+        self.assertFalse(hasattr(song, '__dict__'))
+        with self.assertRaises(AttributeError):
+            song.not_a_field = 1
+
+    def test_memory_usage(self):
+        import tracemalloc
+        from fuocore.models import SongModel
+
+        class DictSongModel(Model):
+            class Meta:
+                fields = SongModel._meta.fields
+
+        def measure(model_cls, count=2000):
+            tracemalloc.start()
+            songs = [model_cls(source='fake', identifier=i, title='hello')
+                     for i in range(count)]
+            size, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            assert len(songs) == count
+            return size
+
+        self.assertLess(measure(SongModel), measure(DictSongModel))
+
+
+class TestDetailField(TestCase):
+
+    def test_fetch_detail_lazily(self):
+        from fuocore.models import AlbumModel
+
+        class FakeAlbumModel(AlbumModel):
+            _detail_fields = ('songs', 'desc')
+            get_count = 0
+
+            @classmethod
+            def get(cls, identifier):
+                cls.get_count += 1
+                return cls(identifier=identifier, name='album',
+                           songs=[], desc='desc')
+
+        album = FakeAlbumModel(identifier=1, name='album')
+        self.assertEqual(album.name, 'album')
+        self.assertEqual(FakeAlbumModel.get_count, 0)
+        self.assertEqual(album.songs, [])
+        self.assertEqual(album.desc, 'desc')
+        self.assertEqual(FakeAlbumModel.get_count, 1)
+
+    def test_detail_field_declared_in_meta(self):
+        from fuocore.models import BaseModel
+
+        class FakeModel(BaseModel):
+            _detail_fields = ('extra', )
+
+            class Meta:
+                fields = ('extra', )
+
+            @classmethod
+            def get(cls, identifier):
+                return cls(identifier=identifier, extra='extra')
+
+        obj = FakeModel(identifier=1)
+        self.assertEqual(obj.extra, 'extra')
+
+    def test_redeclare_detail_fields(self):
+        from fuocore.models import AlbumModel
+
+        class FakeAlbumModel(AlbumModel):
+            _detail_fields = ('songs', )
+            get_count = 0
+
+            @classmethod
+            def get(cls, identifier):
+                cls.get_count += 1
+                return cls(identifier=identifier)  # songs is unknown
+
+        class SubAlbumModel(FakeAlbumModel):
+            _detail_fields = ('songs', )
+
+        album = SubAlbumModel(identifier=1)
+        self.assertIsNone(album.songs)
+        # get_raw of parent's DetailField is not called, so it is
+        # fetched only once
+        self.assertEqual(SubAlbumModel.get_count, 1)
+
+
+class TestModelKey(TestCase):
+
+    def test_hash_and_eq(self):
+        from fuocore.models import AlbumModel, SongModel
+
+        s1 = SongModel(source='fake', identifier=1, title='hello')
+        s2 = SongModel(source='fake', identifier=1, title='world')
+        album = AlbumModel(source='fake', identifier=1)
+        self.assertEqual(s1, s2)
+        self.assertNotEqual(s1, album)
+        self.assertNotEqual(s1, object())
+        self.assertEqual(len({s1, s2, album}), 2)
+
+    def test_key_changed_with_identifier(self):
+        from fuocore.models import SongModel
+
+        song = SongModel(source='fake', identifier=1)
+        self.assertEqual(song.key[2], 1)
+        song.identifier = 2
+        self.assertEqual(song.key[2], 2)
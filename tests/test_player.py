@@ -2,7 +2,14 @@ import os
 import time
 from unittest import TestCase, skipIf
 
-from fuocore.player import MpvPlayer, Playlist
+from fuocore.models import SongModel
+from fuocore.player import (
+    AbstractPlayer,
+    MpvPlayer,
+    NullPlayer,
+    Playlist,
+    State,
+)
 
 
 MP3_URL = os.path.join(os.path.dirname(__file__),
@@ -13,6 +20,11 @@ class FakeSongModel:  # pylint: disable=all
     pass
 
 
+class FakePlayer(AbstractPlayer):  # pylint: disable=all
+    play = play_song = resume = pause = toggle = stop = \
+        initialize = shutdown = lambda *args: None
+
+
 class TestPlayer(TestCase):
     def setUp(self):
         self.player = MpvPlayer()
@@ -66,3 +78,65 @@ class TestPlaylist(TestCase):
     def test_remove(self):
         self.playlist.remove(self.s1)
         self.assertEqual(len(self.playlist), 1)
+
+
+class TestPositionChanged(TestCase):
+    def setUp(self):
+        self.positions = []
+        self.player = FakePlayer(position_interval=10)
+        self.player.position_changed.connect(self.on_position_changed)
+
+    def on_position_changed(self, position):
+        self.positions.append(position)
+
+    def test_coalesce(self):
+        for position in range(10):
+            self.player._emit_position_changed(position)
+        self.assertEqual(self.positions, [0])
+        self.assertEqual(self.player.position, 9)
+
+    def test_emit_when_state_changed(self):
+        for position in range(10):
+            self.player._emit_position_changed(position)
+        self.player.state = State.paused
+        self.assertEqual(self.positions, [0, 9])
+        self.player._emit_position_changed(10)
+        self.assertEqual(self.positions, [0, 9, 10])
+
+
+class TestNullPlayer(TestCase):
+    def setUp(self):
+        self.player = NullPlayer(speed=1000, position_interval=0)
+        self.player.song_finished.connect(self.on_song_finished)
+        self.finished_count = 0
+        self.song = SongModel(source='fake', identifier=1, title='hello',
+                              duration=200000)  # 200s
+
+    def on_song_finished(self):
+        self.finished_count += 1
+
+    def test_play(self):
+        self.player.play_song(self.song)
+        self.assertEqual(self.player.state, State.playing)
+        self.assertEqual(self.player.duration, 200)
+        time.sleep(0.01)
+        self.player.tick()
+        self.assertTrue(0 < self.player.position < 200)
+        self.assertEqual(self.finished_count, 0)
+
+        time.sleep(0.2)
+        self.player.tick()
+        self.assertEqual(self.player.position, 200)
+        self.assertEqual(self.finished_count, 1)
+
+    def test_pause(self):
+        self.player.play_song(self.song)
+        self.player.pause()
+        position = self.player.position
+        time.sleep(0.01)
+        self.player.tick()
+        self.assertEqual(self.player.position, position)
+        self.player.resume()
+        time.sleep(0.01)
+        self.player.tick()
+        self.assertGreater(self.player.position, position)
@@ -0,0 +1,132 @@
+import asyncio
+import socket
+from unittest import TestCase
+
+from fuocore.pubsub import (
+    DeadSubscriber, Gateway, OverflowPolicy, Subscriber, handle
+)
+
+
+class TestGateway(TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.gateway = Gateway(loop=self.loop)
+        self.gateway.add_topic('topic.live_lyric')
+
+        self.server_conn, self.client_conn = socket.socketpair()
+        self.server_conn.setblocking(False)
+        self.subscriber = Subscriber(('127.0.0.1', 1), self.server_conn)
+
+    def tearDown(self):
+        self.server_conn.close()
+        self.client_conn.close()
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def run_subscriber(self, timeout=0.1):
+        task = self.loop.create_task(self.subscriber.run())
+        self.loop.run_until_complete(asyncio.sleep(timeout))
+        task.cancel()
+        self.loop.run_until_complete(asyncio.sleep(0))
+
+    def test_publish(self):
+        self.gateway.link('topic.live_lyric', self.subscriber)
+        self.gateway.publish('hello\n', 'topic.live_lyric')
+        self.gateway.publish('world\n', 'topic.live_lyric')
+        self.run_subscriber()
+        self.assertEqual(self.client_conn.recv(1024), b'hello\nworld\n')
+
+    def test_bounded_queue(self):
+        self.subscriber = Subscriber(('127.0.0.1', 1), self.server_conn,
+                                     maxsize=1)
+        self.gateway.link('topic.live_lyric', self.subscriber)
+        self.gateway.publish('hello\n', 'topic.live_lyric')
+        self.gateway.publish('world\n', 'topic.live_lyric')
+        self.run_subscriber()
+        self.assertEqual(self.client_conn.recv(1024), b'world\n')
+
+    def test_drop_newest(self):
+        self.subscriber = Subscriber(('127.0.0.1', 1), self.server_conn,
+                                     maxsize=1,
+                                     policy=OverflowPolicy.drop_newest)
+        self.gateway.link('topic.live_lyric', self.subscriber)
+        self.gateway.publish('hello\n', 'topic.live_lyric')
+        self.gateway.publish('world\n', 'topic.live_lyric')
+        self.run_subscriber()
+        self.assertEqual(self.client_conn.recv(1024), b'hello\n')
+        self.assertEqual(self.subscriber.dropped_count, 1)
+        self.assertEqual(self.subscriber.sent_count, 1)
+
+    def test_disconnect_slow_subscriber(self):
+        self.subscriber = Subscriber(('127.0.0.1', 1), self.server_conn,
+                                     maxsize=1,
+                                     policy=OverflowPolicy.disconnect)
+        self.gateway.link('topic.live_lyric', self.subscriber)
+        self.gateway.publish('hello\n', 'topic.live_lyric')
+        self.gateway.publish('world\n', 'topic.live_lyric')
+        self.loop.run_until_complete(asyncio.sleep(0))
+        with self.assertRaises(DeadSubscriber):
+            self.loop.run_until_complete(self.subscriber.run())
+        self.assertEqual(self.client_conn.recv(1024), b'')
+
+    def test_subscribe_wildcard(self):
+        self.assertFalse(self.gateway.subscribe('player.state',
+                                                self.subscriber))
+        self.assertTrue(self.gateway.subscribe('player.*', self.subscriber))
+        self.gateway.add_topic('player.state')
+        self.gateway.add_topic('player.volume')
+        self.assertTrue(self.gateway.subscribe('topic.live_lyric',
+                                               self.subscriber))
+        self.gateway.publish('player.state playing\n', 'player.state')
+        self.gateway.publish('player.volume 100\n', 'player.volume')
+        self.gateway.publish('hello\n', 'topic.live_lyric')
+        self.loop.run_until_complete(asyncio.sleep(0))
+        self.gateway.unsubscribe('player.*', self.subscriber)
+        self.gateway.publish('player.state paused\n', 'player.state')
+        self.run_subscriber()
+        self.assertEqual(self.client_conn.recv(1024),
+                         b'player.state playing\nplayer.volume 100\nhello\n')
+
+    def run_handle(self):
+        return self.loop.create_task(
+            handle(self.server_conn, ('127.0.0.1', 1), self.gateway))
+
+    def test_handle_invalid_bytes(self):
+        self.client_conn.sendall(b'\xff\xfe\n')
+        self.client_conn.shutdown(socket.SHUT_WR)
+        self.loop.run_until_complete(self.run_handle())
+        self.assertEqual(self.client_conn.recv(1024),
+                         b'OK pubsub 1.0\nInvalid command\n')
+        self.assertEqual(self.gateway.subscribers, set())
+        self.assertEqual(self.server_conn.fileno(), -1)
+
+    def test_handle_split_command(self):
+        task = self.run_handle()
+        self.client_conn.sendall(b'sub topic.li')
+        self.loop.run_until_complete(asyncio.sleep(0.05))
+        self.client_conn.sendall(b've_lyric\nunsub topic.live_lyric')
+        self.client_conn.shutdown(socket.SHUT_WR)
+        self.loop.run_until_complete(task)
+        self.assertEqual(self.client_conn.recv(1024),
+                         b'OK pubsub 1.0\nACK sub topic.live_lyric\n'
+                         b'ACK unsub topic.live_lyric\n')
+
+    def test_handle_half_close(self):
+        # echo "sub topic.live_lyric" | nc host port
+        task = self.run_handle()
+        self.client_conn.sendall(b'sub topic.live_lyric\n')
+        self.client_conn.shutdown(socket.SHUT_WR)
+        self.loop.run_until_complete(asyncio.sleep(0.05))
+        self.gateway.publish('hello\n', 'topic.live_lyric')
+        self.loop.run_until_complete(asyncio.sleep(0.05))
+        self.assertEqual(self.client_conn.recv(1024),
+                         b'OK pubsub 1.0\nACK sub topic.live_lyric\n'
+                         b'hello\n')
+        self.assertFalse(task.done())
+
+        # subscriber is removed once it fails to send message
+        self.client_conn.close()
+        self.gateway.publish('world\n', 'topic.live_lyric')
+        self.loop.run_until_complete(task)
+        self.assertEqual(self.gateway.subscribers, set())
@@ -0,0 +1,73 @@
+import json
+import os
+from unittest import TestCase
+
+from marshmallow import ValidationError
+
+from fuocore.models import BaseModel, DetailField
+from fuocore.netease.schemas import (
+    NeteasePlaylistSchema,
+    NeteaseSongSchema,
+    load_playlist,
+    load_song,
+)
+
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), '../data/fixtures')
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name)) as f:
+        return json.load(f)
+
+
+def dump(obj):
+    """把模型转换成可比较的结构，不触发 property 和 DetailField 的网络请求"""
+    if isinstance(obj, list):
+        return [dump(each) for each in obj]
+    if isinstance(obj, BaseModel):
+        cls = type(obj)
+        values = {}
+        for field in obj._meta.fields:
+            attr = getattr(cls, field)
+            if isinstance(attr, DetailField):
+                value = attr.get_raw(obj)
+            elif isinstance(attr, property):
+                value = getattr(obj, '_' + field)
+            else:
+                value = getattr(obj, field)
+            values[field] = dump(value)
+        return cls, values
+    return obj
+
+
+class TestCompiledLoader(TestCase):
+    def test_song_same_as_schema(self):
+        songs = read_fixture('search.json')['result']['songs']
+        songs += read_fixture('song.json')['songs']
+        for data in songs:
+            song, _ = NeteaseSongSchema(strict=True).load(data)
+            self.assertEqual(dump(load_song(data)), dump(song))
+
+    def test_playlist_same_as_schema(self):
+        data = read_fixture('playlist.json')['result']
+        playlist, _ = NeteasePlaylistSchema(strict=True).load(data)
+        self.assertEqual(dump(load_playlist(data)), dump(playlist))
+
+    def test_validation(self):
+        data = read_fixture('song.json')['songs'][0]
+        song = dict(data)
+        song.pop('name')
+        with self.assertRaises(ValidationError) as cm:
+            load_song(song)
+        self.assertIn('title', cm.exception.messages)
+
+        song = dict(data, duration='xxx')
+        with self.assertRaises(ValidationError):
+            load_song(song)
+
+        song = dict(data, album=None)
+        with self.assertRaises(ValidationError):
+            NeteaseSongSchema(strict=True).load(song)
+        with self.assertRaises(ValidationError):
+            load_song(song)
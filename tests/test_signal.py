@@ -1,3 +1,5 @@
+import asyncio
+import threading
 from unittest import TestCase
 
 from fuocore.dispatch import Signal
@@ -57,3 +59,64 @@ class SignalTest(TestCase):
         def f():
             pass
         self.assertTrue(mock_connect.called)
+
+    def test_emit_in_connection_order(self):
+        s = Signal()
+        calls = []
+
+        def f1(*args):
+            calls.append(1)
+
+        def f2(*args):
+            calls.append(2)
+
+        s.connect(f2)
+        s.connect(f1)
+        s.connect(f2)
+        s.emit()
+        self.assertEqual(calls, [2, 1])
+
+    def test_dead_receiver_removed(self):
+        s = Signal()
+        a = A()
+        s.connect(a.f)
+        s.connect(f)
+        self.assertEqual(len(s.receivers), 2)
+        del a
+        self.assertEqual(len(s.receivers), 1)
+        s.emit()
+
+    def test_queued_connection(self):
+        loop = asyncio.new_event_loop()
+        s = Signal()
+        calls = []
+
+        def f(*args):
+            calls.append((threading.current_thread(), args))
+
+        s.connect(f, loop=loop)
+        thread = threading.Thread(target=s.emit, args=(1, 'hello'))
+        thread.start()
+        thread.join()
+        self.assertEqual(calls, [])
+        loop.run_until_complete(asyncio.sleep(0))
+        self.assertEqual(calls, [(threading.current_thread(), (1, 'hello'))])
+        loop.close()
+
+    def test_queued_connection_loop_closed(self):
+        loop = asyncio.new_event_loop()
+        loop.close()
+        s = Signal()
+        calls = []
+
+        def queued(*args):
+            calls.append('queued')
+
+        def direct(*args):
+            calls.append('direct')
+
+        s.connect(queued, loop=loop)
+        s.connect(direct)
+        s.emit(1)
+        self.assertEqual(calls, ['direct'])
+        self.assertEqual(len(s.receivers), 1)